@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+End-to-end benchmark over a fixed subset of dataset/curated: every contract
+of the suite is fuzzed with every seed of the suite and the same generation
+budget, in a separate process. Per contract it reports the median of
+executions per second, code and branch coverage, peak RSS and solver time,
+and, per expected bug, the detection rate and the median number of
+transactions and seconds until the first detection.
+
+A run can be compared with a previous one (the baseline): a metric that is
+worse than the baseline by more than the threshold of the suite is reported
+as a regression and the benchmark exits with status 1.
+
+Usage (from the fuzzer directory):
+    python3 -m benchmarks.curated_benchmark --output baseline.json
+    python3 -m benchmarks.curated_benchmark --output run.json --baseline baseline.json
+'''
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+FUZZER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CURATED = os.path.join(os.path.dirname(FUZZER), "dataset", "curated")
+SUITE = os.path.join(FUZZER, "benchmarks", "curated.json")
+
+# Metrics compared with the baseline, and whether higher values are better
+METRICS = {
+    "executions_per_second": True,
+    "code_coverage": True,
+    "peak_rss": False,
+    "solver_seconds": False,
+}
+
+def fuzz(entry, seed, suite, directory):
+    '''
+    Fuzz one contract with one seed and collect the measurements of the run.
+    '''
+    name = "{}-{}".format(entry["contract"], seed)
+    results_path = os.path.join(directory, name + ".json")
+    command = [sys.executable, "main.py", "-s", os.path.join(CURATED, entry["source"]), "-c", entry["contract"],
+               "--solc", suite["solc"], "-g", str(suite["generations"]), "--seed", str(seed), "-r", results_path]
+    with open(os.path.join(directory, name + ".log"), "w") as log:
+        begin = time.time()
+        process = subprocess.Popen(command, cwd=FUZZER, stdout=log, stderr=subprocess.STDOUT, env=dict(os.environ, PYTHONHASHSEED="1"))
+        # wait4 gives the resource usage of this child only
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        wall_time = time.time() - begin
+
+    run = {"source": entry["source"], "contract": entry["contract"], "seed": seed, "exit_code": process.returncode,
+           "wall_time": wall_time, "peak_rss": usage.ru_maxrss * 1024}
+    if process.returncode != 0 or not os.path.exists(results_path):
+        return run
+    with open(results_path) as file:
+        results = json.load(file)[entry["contract"]]
+
+    run["executions_per_second"] = results["transactions"]["per_second"]
+    run["code_coverage"] = results["code_coverage"]["percentage"]
+    run["branch_coverage"] = results["branch_coverage"]["percentage"]
+    run["solver_seconds"] = results.get("phases", {}).get("solver", 0.0)
+    run["solver_calls"] = results.get("counters", {}).get("solver_calls", 0)
+    run["detections"] = dict()
+    for errors in results["errors"].values():
+        for error in errors:
+            detection = run["detections"].get(error["type"])
+            if detection is None or error["time"] < detection["time"]:
+                run["detections"][error["type"]] = {"time": error["time"], "transactions": error.get("transactions")}
+    return run
+
+def median(values):
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else None
+
+def summarize(entry, runs):
+    completed = [run for run in runs if "detections" in run]
+    summary = {metric: median(run.get(metric) for run in completed) for metric in list(METRICS) + ["branch_coverage", "solver_calls"]}
+    summary["failed_runs"] = len(runs) - len(completed)
+    summary["detections"] = dict()
+    for type in entry["expected"]:
+        detections = [run["detections"][type] for run in completed if type in run["detections"]]
+        summary["detections"][type] = {
+            "rate": len(detections) / len(runs),
+            "transactions_to_detection": median(detection["transactions"] for detection in detections),
+            "time_to_detection": median(detection["time"] for detection in detections),
+        }
+    return summary
+
+def compare(summaries, baseline, thresholds):
+    '''
+    Returns the regressions of summaries with respect to the baseline.
+    '''
+    regressions = []
+    for contract, summary in summaries.items():
+        if contract not in baseline:
+            continue
+        reference = baseline[contract]
+        for metric, higher_is_better in METRICS.items():
+            current, previous = summary.get(metric), reference.get(metric)
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous
+            if (-change if higher_is_better else change) > thresholds[metric]:
+                regressions.append("{}: {} {:.4g} -> {:.4g} ({:+.1%})".format(contract, metric, previous, current, change))
+        for type, detection in summary["detections"].items():
+            previous = reference["detections"].get(type)
+            if not previous:
+                continue
+            if detection["rate"] < previous["rate"]:
+                regressions.append("{}: {} detected in {:.0%} of the runs instead of {:.0%}".format(contract, type, detection["rate"], previous["rate"]))
+            elif detection["transactions_to_detection"] and previous["transactions_to_detection"]:
+                change = (detection["transactions_to_detection"] - previous["transactions_to_detection"]) / previous["transactions_to_detection"]
+                if change > thresholds["transactions_to_detection"]:
+                    regressions.append("{}: {} after {:.0f} transactions instead of {:.0f} ({:+.1%})".format(
+                        contract, type, detection["transactions_to_detection"], previous["transactions_to_detection"], change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fuzzer over a fixed subset of dataset/curated.")
+    parser.add_argument("--suite", type=str, default=SUITE, help="Benchmark suite (default: benchmarks/curated.json)")
+    parser.add_argument("--contracts", type=str, nargs="+", help="Only run these contracts of the suite")
+    parser.add_argument("--output", type=str, help="JSON file where the runs and their summary are written")
+    parser.add_argument("--baseline", type=str, help="Output of a previous benchmark run to compare with")
+    args = parser.parse_args()
+
+    with open(args.suite) as file:
+        suite = json.load(file)
+    entries = [entry for entry in suite["contracts"] if not args.contracts or entry["contract"] in args.contracts]
+
+    runs, summaries = [], dict()
+    with tempfile.TemporaryDirectory() as directory:
+        for entry in entries:
+            entry_runs = []
+            for seed in suite["seeds"]:
+                run = fuzz(entry, seed, suite, directory)
+                entry_runs.append(run)
+                print("{:<40} seed {:<3} {:>8.1f}s  exit {}  {}".format(entry["contract"], seed, run["wall_time"], run["exit_code"],
+                      ", ".join(sorted(run.get("detections", {})))))
+            runs.extend(entry_runs)
+            summaries[entry["contract"]] = summarize(entry, entry_runs)
+
+    print()
+    print("{:<40} {:>10} {:>9} {:>10} {:>9}  {}".format("Contract", "exec/s", "coverage", "RSS (MB)", "solver", "detections (rate, transactions)"))
+    for contract, summary in summaries.items():
+        print("{:<40} {:>10.1f} {:>8.1f}% {:>10.1f} {:>8.1f}s  {}".format(contract, summary["executions_per_second"] or 0, summary["code_coverage"] or 0,
+              (summary["peak_rss"] or 0) / 1024 / 1024, summary["solver_seconds"] or 0,
+              ", ".join("{} ({:.0%}, {})".format(type, detection["rate"], detection["transactions_to_detection"]) for type, detection in summary["detections"].items())))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"suite": suite, "runs": runs, "summary": summaries}, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["summary"]
+        regressions = compare(summaries, baseline, suite["thresholds"])
+        print()
+        if regressions:
+            print("Regressions with respect to {}:".format(args.baseline))
+            for regression in regressions:
+                print("  " + regression)
+            sys.exit(1)
+        print("No regressions with respect to {}.".format(args.baseline))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Microbenchmarks of the per-instruction hot paths, in isolation from the
+genetic algorithm and the constraint solver:
+
+    fuzz_apply_computation              EVM execution (evm.storage_emulation)
+    SymbolicTaintAnalyzer.propagate_taint
+    DetectorExecutor.run_detectors
+    ControlFlowGraph.execute
+
+Traces are recorded once per contract by executing random individuals
+(generated with a fixed seed) against the deployed contract. Each hot path
+is then driven over the recorded traces; the taint records the detectors
+consume are precomputed, so that only the function under test is timed.
+
+Reported per hot path: nanoseconds per instruction (best of --repeat
+runs), and from a separate run under tracemalloc the peak of traced
+bytes and the number of memory blocks retained at the end of the run, both
+per instruction. tracemalloc cannot count transient allocations, so these
+measure the working set of the hot path, not its allocation rate.
+
+Usage (from the fuzzer directory):
+    python3 -m benchmarks.hot_path_benchmark --contracts EtherStore SimpleDAO --individuals 50
+'''
+
+import gc
+import os
+import json
+import time
+import random
+import logging
+import argparse
+import tracemalloc
+
+from eth_utils import encode_hex
+
+from evm import InstrumentedEVM
+from detectors import DetectorExecutor
+from engine.components import Generator, Individual
+from engine.analysis import SymbolicTaintAnalyzer
+from engine.environment import FuzzingEnvironment
+from utils import settings
+from utils.utils import compile, get_interface_from_abi
+from utils.control_flow_graph import ControlFlowGraph
+
+from .curated_benchmark import CURATED, SUITE
+
+class Recording:
+    '''
+    Transactions of random individuals and the instruction traces they produced.
+    '''
+    def __init__(self, name, evm, contract_address, runtime_bytecode):
+        self.name = name
+        self.evm = evm
+        self.contract_address = contract_address
+        self.runtime_bytecode = runtime_bytecode
+        # One entry per individual: [(transaction, trace), ...]
+        self.individuals = []
+        self.instructions = 0
+
+def record(entry, solc, count, seed):
+    source = os.path.join(CURATED, entry["source"])
+    contract = compile(solc, settings.EVM_VERSION, source)["contracts"][source][entry["contract"]]
+    interface = get_interface_from_abi(contract["abi"])
+    interface.pop("constructor", None)
+    return record_bytecode(entry["contract"], interface, contract["evm"]["bytecode"]["object"], count, seed)
+
+def record_bytecode(name, interface, bytecode, count, seed):
+    evm = InstrumentedEVM()
+    evm.set_vm_by_name(settings.EVM_VERSION)
+    evm.create_fake_accounts()
+    result = evm.deploy_contract(evm.accounts[0], bytecode)
+    if result.is_error:
+        raise ValueError("could not deploy {}: {}".format(name, result._error))
+    contract_address = encode_hex(result.msg.storage_address)
+    evm.create_snapshot()
+
+    random.seed(seed)
+    generator = Generator(interface=interface, bytecode=bytecode, accounts=evm.accounts, contract=contract_address)
+    recording = Recording(name, evm, contract_address, encode_hex(evm.get_code(result.msg.storage_address)))
+    for _ in range(count):
+        individual = Individual(generator=generator).init()
+        transactions = []
+        for transaction in individual.solution:
+            result = evm.deploy_transaction(transaction)
+            transactions.append((transaction, result.trace))
+            recording.instructions += len(result.trace)
+        evm.restore_from_snapshot()
+        recording.individuals.append((individual, transactions))
+    return recording
+
+def run_evm(recording, _):
+    for _, transactions in recording.individuals:
+        for transaction, _ in transactions:
+            recording.evm.deploy_transaction(transaction)
+        recording.evm.restore_from_snapshot()
+
+def run_taint(recording, _):
+    analyzer = SymbolicTaintAnalyzer()
+    for _, transactions in recording.individuals:
+        for _, trace in transactions:
+            for instruction in trace:
+                analyzer.propagate_taint(instruction, recording.contract_address)
+            analyzer.clear_callstack()
+        analyzer.clear_storage()
+
+def prepare_detectors(recording):
+    # Taint records as seen by the detectors during fuzzing
+    analyzer = SymbolicTaintAnalyzer()
+    records = []
+    for _, transactions in recording.individuals:
+        for _, trace in transactions:
+            transaction_records = []
+            for instruction in trace:
+                analyzer.propagate_taint(instruction, recording.contract_address)
+                transaction_records.append(analyzer.get_tainted_record(index=-2))
+            records.append(transaction_records)
+            analyzer.clear_callstack()
+        analyzer.clear_storage()
+    # The locking ether detector reads the control-flow graph
+    return records, prepare_cfg(recording)
+
+def run_detectors(recording, state):
+    records, cfg = state
+    executor = DetectorExecutor()
+    executor.logger.setLevel(logging.CRITICAL)
+    env = FuzzingEnvironment(execution_begin=time.time(), symbolic_taint_analyzer=SymbolicTaintAnalyzer(), cfg=cfg)
+    errors = dict()
+    records = iter(records)
+    for individual, transactions in recording.individuals:
+        executor.initialize_detectors()
+        for transaction_index, (_, trace) in enumerate(transactions):
+            transaction_records = next(records)
+            previous_instruction = None
+            for instruction, tainted_record in zip(trace, transaction_records):
+                executor.run_detectors(previous_instruction, instruction, errors, tainted_record, individual, env, [], transaction_index)
+                previous_instruction = instruction
+
+def prepare_cfg(recording):
+    cfg = ControlFlowGraph()
+    cfg.build(recording.runtime_bytecode, settings.EVM_VERSION)
+    return cfg
+
+def run_cfg(recording, cfg):
+    visited_branches, error_pcs = dict(), set()
+    for _, transactions in recording.individuals:
+        for _, trace in transactions:
+            for instruction in trace:
+                cfg.execute(instruction["pc"], instruction["stack"], instruction["op"], visited_branches, error_pcs)
+
+HOT_PATHS = {
+    "fuzz_apply_computation": (lambda recording: None, run_evm),
+    "propagate_taint": (lambda recording: None, run_taint),
+    "run_detectors": (prepare_detectors, run_detectors),
+    "ControlFlowGraph.execute": (prepare_cfg, run_cfg),
+}
+
+def measure(recording, prepare, run, repeat):
+    state = prepare(recording)
+    gc.collect()
+    gc.disable()
+    try:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(recording, state)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        # Started for this measurement only, so that the peak is the one of this run
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        base = tracemalloc.get_traced_memory()[0]
+        run(recording, state)
+        peak = tracemalloc.get_traced_memory()[1] - base
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        retained = sum(statistic.count_diff for statistic in after.compare_to(before, "filename"))
+    finally:
+        gc.enable()
+    return best * 1e9 / recording.instructions, peak / recording.instructions, retained / recording.instructions
+
+def main():
+    parser = argparse.ArgumentParser(description="Nanoseconds and memory per instruction of the per-instruction hot paths.")
+    parser.add_argument("--suite", type=str, default=SUITE, help="Benchmark suite listing the contracts (default: benchmarks/curated.json)")
+    parser.add_argument("--contracts", type=str, nargs="+", help="Only run these contracts of the suite")
+    parser.add_argument("--hot-paths", type=str, nargs="+", choices=list(HOT_PATHS), dest="hot_paths", help="Only run these hot paths")
+    parser.add_argument("--individuals", type=int, default=20, help="Number of random individuals recorded per contract (default: 20)")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs, the best one is reported (default: 5)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("--output", type=str, help="JSON file where the measurements are written")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with open(args.suite) as file:
+        suite = json.load(file)
+    entries = [entry for entry in suite["contracts"] if not args.contracts or entry["contract"] in args.contracts]
+    hot_paths = args.hot_paths if args.hot_paths else list(HOT_PATHS)
+
+    measurements = []
+    print("{:<40} {:<26} {:>12} {:>12} {:>14} {:>18}".format("Contract", "Hot path", "instructions", "ns/instr", "peak B/instr", "retained blk/instr"))
+    for entry in entries:
+        try:
+            recording = record(entry, suite["solc"], args.individuals, args.seed)
+        except ValueError as e:
+            print("{:<40} skipped: {}".format(entry["contract"], e))
+            continue
+        if not recording.instructions:
+            continue
+        for hot_path in hot_paths:
+            prepare, run = HOT_PATHS[hot_path]
+            ns, peak, retained = measure(recording, prepare, run, args.repeat)
+            measurements.append({"contract": entry["contract"], "hot_path": hot_path, "instructions": recording.instructions,
+                                 "ns_per_instruction": ns, "peak_traced_bytes_per_instruction": peak, "retained_blocks_per_instruction": retained})
+            print("{:<40} {:<26} {:>12} {:>12.0f} {:>14.1f} {:>18.3f}".format(entry["contract"], hot_path, recording.instructions, ns, peak, retained))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(measurements, file, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Memory footprint of a population: compares the bytes per individual of the
+__slots__ based Gene/Transaction records with the former representation,
+where every gene was a dict and every decoded transaction four nested dicts.
+
+Usage (from the fuzzer directory):
+    python3 -m benchmarks.memory_benchmark --length 20 --individuals 1000
+'''
+
+import random
+import argparse
+import tracemalloc
+
+from copy import deepcopy
+
+from utils import settings
+from engine.components import Generator, Individual
+
+INTERFACE = {
+    "a9059cbb": ["address", "uint256"],
+    "095ea7b3": ["address", "uint256"],
+    "23b872dd": ["address", "address", "uint256"],
+    "d0e30db0": [],
+    "2e1a7d4d": ["uint256"],
+    "f2fde38b": ["address"],
+    "c47f0027": ["string"],
+    "b2bdfa7b": ["bytes32", "bool"],
+    "6a761202": ["uint8[]", "int256"],
+}
+ACCOUNTS = ["0xcafebabecafebabecafebabecafebabecafebabe", "0xdeadbeefdeadbeefdeadbeefdeadbeefdeadbeef"]
+CONTRACT = "0x0123456789012345678901234567890123456789"
+
+def generate_population(size, length):
+    generator = Generator(interface=dict(INTERFACE), bytecode="", accounts=ACCOUNTS, contract=CONTRACT)
+    individuals = []
+    for _ in range(size):
+        chromosome = []
+        while len(chromosome) < length:
+            chromosome += generator.generate_random_individual()
+        individuals.append(Individual(generator=generator).init(chromosome=chromosome[:length]))
+    return individuals
+
+def as_dicts(individual):
+    return [dict(gene.items()) for gene in individual.chromosome], [transaction.to_dict() for transaction in individual.solution]
+
+def as_slots(individual):
+    return individual.chromosome, individual.solution
+
+def measure(individuals, representation):
+    tracemalloc.start()
+    population = deepcopy([representation(individual) for individual in individuals])
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del population
+    return size / len(individuals)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per individual of dict and __slots__ genes.")
+    parser.add_argument("--length", type=int, default=settings.MAX_INDIVIDUAL_LENGTH, help="Number of transactions per individual (default: " + str(settings.MAX_INDIVIDUAL_LENGTH) + ")")
+    parser.add_argument("--individuals", type=int, default=1000, help="Number of individuals (default: 1000)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    individuals = generate_population(args.individuals, args.length)
+    before = measure(individuals, as_dicts)
+    after = measure(individuals, as_slots)
+    print("Transactions per individual: %d" % args.length)
+    print("dict genes:      %10.0f bytes per individual" % before)
+    print("__slots__ genes: %10.0f bytes per individual (%.1f%%)" % (after, 100.0 * after / before))
+
+if __name__ == '__main__':
+    main()
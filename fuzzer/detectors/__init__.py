@@ -61,9 +61,9 @@ class DetectorExecutor:
             "swc_id": detector.swc_id,
             "severity": detector.severity,
             "type": type,
-            "individual": individual.solution,
+            "individual": [transaction.to_dict() for transaction in individual.solution],
             "time": time.time() - mfe.execution_begin,
-
+            "transactions": mfe.nr_of_transactions,
         }
         if source_map and source_map.get_buggy_line(pc):
             error["line"] = source_map.get_location(pc)['begin']['line'] + 1
@@ -13,6 +13,6 @@ class LockingEtherDetector():
         # Check if we cannot send ether
         if not cfg.can_send_ether:
             # Check if we can receive ether
-            if current_instruction["op"] == "STOP" and individual.solution[transaction_index]["transaction"]["value"] > 0:
+            if current_instruction["op"] == "STOP" and individual.solution[transaction_index].value > 0:
                 return current_instruction["pc"], transaction_index
         return None, None
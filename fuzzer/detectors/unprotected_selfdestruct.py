@@ -17,11 +17,11 @@ class UnprotectedSelfdestructDetector():
         if current_instruction["op"] in ["SELFDESTRUCT", "SUICIDE"]:
             for i in range(transaction_index):
                 # Check if it is a trusted account
-                if individual.solution[i]["transaction"]["from"] not in settings.ATTACKER_ACCOUNTS:
+                if individual.solution[i].sender not in settings.ATTACKER_ACCOUNTS:
                     # Add the arguments to the list of trusted arguments
-                    if individual.solution[i]["transaction"]["data"] not in self.trusted_arguments:
-                        self.trusted_arguments += individual.solution[i]["transaction"]["data"]
+                    if individual.solution[i].data not in self.trusted_arguments:
+                        self.trusted_arguments += individual.solution[i].data
             # An unprotected selfdestruct is detected if the sender of the transaction is an attacker and not trusted by a trusted account
-            if individual.solution[transaction_index]["transaction"]["from"] in settings.ATTACKER_ACCOUNTS and not individual.solution[transaction_index]["transaction"]["from"].replace("0x", "") in self.trusted_arguments:
+            if individual.solution[transaction_index].sender in settings.ATTACKER_ACCOUNTS and not individual.solution[transaction_index].sender.replace("0x", "") in self.trusted_arguments:
                 return current_instruction["pc"], transaction_index
         return None, None
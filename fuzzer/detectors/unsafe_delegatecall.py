@@ -17,7 +17,7 @@ class UnsafeDelegatecallDetector():
         if current_instruction["op"] == "DELEGATECALL":
             if tainted_record and tainted_record.stack[-2] and is_expr(tainted_record.stack[-2][0]):
                 for index in range(len(individual.solution)):
-                    if individual.solution[index]["transaction"]["from"] not in settings.ATTACKER_ACCOUNTS:
+                    if individual.solution[index].sender not in settings.ATTACKER_ACCOUNTS:
                         return None, None
                 self.delegatecall = current_instruction["pc"], transaction_index
         elif current_instruction["op"] == "STOP" and self.delegatecall:
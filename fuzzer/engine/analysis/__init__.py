@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from .checkpoint import Checkpoint
 from .execution_trace_analysis import ExecutionTraceAnalyzer
+from .metrics import MetricsReporter
 from .symbolic_taint_analysis import SymbolicTaintAnalyzer
+from .timeline import Timeline
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import pickle
+import random
+import hashlib
+import threading
+
+from z3 import Solver, parse_smt2_string
+
+from engine.components import Generator, Individual
+from engine.components.corpus import CorpusEntry
+from utils import settings
+from utils.utils import initialize_logger
+
+class Checkpoint:
+    '''
+    Periodic checkpoint of a fuzzing session, from which a killed run can be
+    resumed with --resume.
+
+    The session is split into parts (environment, generator pools, population,
+    corpus, engine and RNG state, EVM snapshot), each pickled to its own file.
+    A part is only written when its content changed since the previous
+    checkpoint, and the EVM snapshot is only pickled again after a new
+    snapshot was taken. The manifest checkpoint.json, naming the files of the
+    checkpoint, is replaced last, so that a checkpoint is either complete or
+    not visible at all. The state is pickled in the fuzzing loop, the files
+    are written by a background thread. z3 expressions cannot be pickled, the
+    path conditions of the visited branches are stored in the SMT-LIB format.
+    '''
+    ENVIRONMENT = ("nr_of_transactions", "unique_individuals", "code_coverage", "branch_coverage", "edge_coverage",
+                   "children_code_coverage", "previous_code_coverage_length", "visited_branches", "data_dependencies",
+                   "all_reads", "coverage_version", "results", "overall_pcs", "overall_jumpis",
+                   "len_overall_pcs_with_children", "other_contracts", "metrics", "reached_targets")
+
+    def __init__(self, directory, interval=None):
+        self.logger = initialize_logger("Checkpoint")
+        self.directory = directory
+        self.interval = settings.CHECKPOINT_INTERVAL if interval is None else interval
+        os.makedirs(self.directory, exist_ok=True)
+        self.last = 0
+        self.digests = dict()
+        self.snapshot_version = None
+        self.writer = None
+        # Files of the checkpoint on disk, replaced ones are removed once the new manifest is written
+        manifest = self.read_manifest()
+        self.counter = manifest["counter"] if manifest else 0
+        self.files = manifest["files"] if manifest else dict()
+
+    def read_manifest(self):
+        path = os.path.join(self.directory, "checkpoint.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            return json.load(file)
+
+    def due(self):
+        return time.time() - self.last >= self.interval
+
+    def save(self, env, generator, population, engine, analyzer):
+        if self.writer and self.writer.is_alive():
+            self.logger.debug("Previous checkpoint is still being written, skipping")
+            return
+        self.last = time.time()
+
+        parts = {
+            "environment": {field: Checkpoint.encode_visited_branches(env.visited_branches) if field == "visited_branches" else getattr(env, field)
+                            for field in Checkpoint.ENVIRONMENT},
+            "generator": {"pools": {pool: getattr(generator, pool) for pool in Generator.POOLS + ("function_circular_buffer",)},
+                          "accounts": list(generator.accounts)},
+            "population": [individual.chromosome for individual in population.individuals],
+            "engine": {"generation": engine.current_generation,
+                       "time": time.time() - env.execution_begin,
+                       "random": random.getstate(),
+                       "symbolic_execution_count": analyzer.symbolic_execution_count}
+        }
+        if env.corpus is not None:
+            parts["corpus"] = {"entries": [(entry.individual.chromosome, entry.branches, entry.cost, entry.picks) for entry in env.corpus.entries.values()],
+                               "branch_hits": env.corpus.branch_hits,
+                               "executions": env.corpus.executions,
+                               "total_cost": env.corpus.total_cost}
+        try:
+            payloads = {part: pickle.dumps(state, pickle.HIGHEST_PROTOCOL) for part, state in parts.items()}
+            # The snapshot is only replaced, never modified, so its version tells whether it changed
+            if self.snapshot_version != env.instrumented_evm.snapshot_version:
+                # The database class of the EVM is local to InstrumentedEVM, only its content can be pickled
+                payloads["evm"] = pickle.dumps(env.instrumented_evm.snapshot.wrapped_db.kv_store, pickle.HIGHEST_PROTOCOL)
+                self.snapshot_version = env.instrumented_evm.snapshot_version
+        except (pickle.PicklingError, TypeError, ValueError, AttributeError) as e:
+            # A failed checkpoint must not end the fuzzing session
+            self.logger.error("Could not checkpoint the fuzzing session: %s", e)
+            return
+
+        self.counter += 1
+        files, changed = dict(), dict()
+        for part in list(payloads) + (["evm"] if "evm" not in payloads and "evm" in self.files else []):
+            if part in payloads:
+                digest = hashlib.blake2b(payloads[part], digest_size=16).digest()
+                if self.digests.get(part) != digest or part not in self.files:
+                    self.digests[part] = digest
+                    files[part] = "{}-{}.pickle".format(part, self.counter)
+                    changed[files[part]] = payloads[part]
+                    continue
+            files[part] = self.files[part]
+        obsolete = [file for part, file in self.files.items() if files.get(part) != file]
+        self.files = files
+        manifest = {"counter": self.counter, "contract": generator.contract, "interface": generator.interface, "files": files}
+
+        self.writer = threading.Thread(target=self.write, args=(changed, manifest, obsolete), daemon=True)
+        self.writer.start()
+
+    @staticmethod
+    def encode_visited_branches(visited_branches):
+        encoded = dict()
+        for pc, sides in visited_branches.items():
+            encoded[pc] = dict()
+            for condition, branch in sides.items():
+                branch = dict(branch)
+                if branch.get("expression"):
+                    expressions = []
+                    for expression in branch["expression"]:
+                        solver = Solver()
+                        solver.add(expression)
+                        expressions.append(solver.sexpr())
+                    branch["expression"] = expressions
+                encoded[pc][condition] = branch
+        return encoded
+
+    @staticmethod
+    def decode_visited_branches(encoded):
+        visited_branches = dict()
+        for pc, sides in encoded.items():
+            visited_branches[pc] = dict()
+            for condition, branch in sides.items():
+                if branch.get("expression"):
+                    branch["expression"] = [parse_smt2_string(expression)[0] for expression in branch["expression"]]
+                visited_branches[pc][condition] = branch
+        return visited_branches
+
+    def write(self, changed, manifest, obsolete):
+        try:
+            for file, payload in changed.items():
+                self.write_file(file, payload)
+            self.write_file("checkpoint.json", json.dumps(manifest).encode())
+            for file in obsolete:
+                try:
+                    os.remove(os.path.join(self.directory, file))
+                except FileNotFoundError:
+                    pass
+        except OSError as e:
+            self.logger.error("Could not write checkpoint to %s: %s", self.directory, e)
+
+    def write_file(self, file, payload):
+        path = os.path.join(self.directory, file)
+        with open(path + ".tmp", "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def join(self):
+        if self.writer:
+            self.writer.join()
+
+    def resume(self, env, generator, population, engine, analyzer):
+        '''
+        Restore the session of the last checkpoint. Returns False if there is
+        no checkpoint or if it belongs to another contract.
+        '''
+        manifest = self.read_manifest()
+        if not manifest:
+            self.logger.warning("No checkpoint found in %s, starting a new session", self.directory)
+            return False
+        if manifest["contract"] != generator.contract or manifest["interface"] != generator.interface:
+            self.logger.warning("Checkpoint in %s belongs to another contract, starting a new session", self.directory)
+            return False
+        parts = dict()
+        for part, file in manifest["files"].items():
+            with open(os.path.join(self.directory, file), "rb") as f:
+                parts[part] = pickle.load(f)
+
+        for field, value in parts["environment"].items():
+            if field == "metrics":
+                # The generator and the engine share the metrics of the environment
+                env.metrics.times.update(value.times)
+                env.metrics.counts.update(value.counts)
+            elif field == "visited_branches":
+                env.visited_branches = Checkpoint.decode_visited_branches(value)
+            else:
+                setattr(env, field, value)
+
+        for pool, value in parts["generator"]["pools"].items():
+            setattr(generator, pool, value)
+        # The generator shares its list of accounts with the EVM
+        generator.accounts[:] = parts["generator"]["accounts"]
+
+        population.individuals = [Individual(generator=generator).init(chromosome=chromosome) for chromosome in parts["population"]]
+
+        if "corpus" in parts and env.corpus is not None:
+            for chromosome, branches, cost, picks in parts["corpus"]["entries"]:
+                entry = CorpusEntry(Individual(generator=generator).init(chromosome=chromosome), branches, cost)
+                entry.picks = picks
+                env.corpus.entries[entry.individual.hash] = entry
+            env.corpus.branch_hits = parts["corpus"]["branch_hits"]
+            env.corpus.executions = parts["corpus"]["executions"]
+            env.corpus.total_cost = parts["corpus"]["total_cost"]
+
+        env.instrumented_evm.snapshot.wrapped_db.kv_store = parts["evm"]
+        env.instrumented_evm.restore_from_snapshot()
+        env.instrumented_evm.create_snapshot()
+
+        engine.current_generation = parts["engine"]["generation"]
+        engine.elapsed_time = parts["engine"]["time"]
+        env.execution_begin = time.time() - parts["engine"]["time"]
+        analyzer.symbolic_execution_count = parts["engine"]["symbolic_execution_count"]
+        analyzer.phase_times = dict(env.metrics.times)
+        random.setstate(parts["engine"]["random"])
+
+        self.last = time.time()
+        self.logger.info("Resumed from checkpoint %s at generation %d", self.directory, engine.current_generation + 1)
+        return True
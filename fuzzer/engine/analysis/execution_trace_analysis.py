@@ -5,6 +5,7 @@ import os
 import time
 import json
 import psutil
+import collections
 
 from engine.environment import FuzzingEnvironment
 from engine.plugin_interfaces import OnTheFlyAnalysis
@@ -19,21 +20,40 @@ from z3 import simplify, BitVec, BitVecVal, Not, Optimize, sat, unsat, unknown,
 from z3.z3util import get_vars
 
 from utils import settings
+from utils.results import ResultsLog
+
+from .exploit_minimization import ExploitMinimizer
 
 class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
     def __init__(self, fuzzing_environment: FuzzingEnvironment) -> None:
         self.logger = initialize_logger("Analysis")
         self.env = fuzzing_environment
         self.symbolic_execution_count = 0
+        self.exploit_minimizer = ExploitMinimizer(self) if settings.EXPLOIT_MINIMIZATION else None
+        # Branches, data dependencies, target distances and costs of executed individuals, valid as long as the snapshot is unchanged
+        self.execution_cache = collections.OrderedDict()
+        self.execution_cache_snapshot = None
+        # Cumulative phase times at the previous generation
+        self.phase_times = dict()
+        # Records are streamed to a .jsonl results file as they are produced
+        self.results_log = None
+        if self.env.args.results and self.env.args.results.lower().endswith(".jsonl"):
+            self.results_log = ResultsLog(self.env.args.results)
+        self.reported_errors = set()
 
     def setup(self, ng, engine):
         pass
 
     def execute(self, population, engine):
-        self.env.memoized_fitness.clear()
         self.env.memoized_storage.clear()
         self.env.memoized_symbolic_execution.clear()
         self.env.individual_branches.clear()
+        self.env.individual_edges.clear()
+        self.env.individual_distances.clear()
+
+        if self.execution_cache_snapshot != self.env.instrumented_evm.snapshot_version:
+            self.execution_cache.clear()
+            self.execution_cache_snapshot = self.env.instrumented_evm.snapshot_version
 
         """from utils.utils import get_function_signature_mapping
         m = get_function_signature_mapping(self.env.abi)
@@ -50,12 +70,27 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
             print(b)"""
 
 
+        errors = self.env.results["errors"]
         executed_individuals = dict()
         for i, individual in enumerate(population.individuals):
+            if self.env.timeline:
+                self.env.timeline.sample(self.env)
             if individual.hash in executed_individuals:
                 population.individuals[i] = executed_individuals[individual.hash]
                 continue
+            self.env.metrics.increment("execution_cache_lookups")
+            if individual.hash in self.execution_cache:
+                self.env.metrics.increment("execution_cache_hits")
+                self.replay_execution(individual, self.env)
+                executed_individuals[individual.hash] = individual
+                continue
+            if self.exploit_minimizer:
+                known_errors = {pc: len(errors[pc]) for pc in errors}
             self.execution_function(individual, self.env)
+            if self.exploit_minimizer:
+                for pc in errors:
+                    for error in errors[pc][known_errors.get(pc, 0):]:
+                        self.exploit_minimizer.submit(individual, pc, error["type"])
             executed_individuals[individual.hash] = individual
         executed_individuals.clear()
 
@@ -65,13 +100,17 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
     def register_step(self, g, population, engine):
         self.execute(population, engine)
 
+        if self.exploit_minimizer:
+            self.exploit_minimizer.poll()
+
+        if self.env.corpus and self.env.corpus.directory:
+            self.env.corpus.save_generator(population.indv_generator)
+
         code_coverage_percentage = 0
         if len(self.env.overall_pcs) > 0:
             code_coverage_percentage = (len(self.env.code_coverage) / len(self.env.overall_pcs)) * 100
 
-        branch_coverage = 0
-        for pc in self.env.visited_branches:
-            branch_coverage += len(self.env.visited_branches[pc])
+        branch_coverage = len(self.env.branch_coverage)
         branch_coverage_percentage = 0
         if len(self.env.overall_jumpis) > 0:
             branch_coverage_percentage = (branch_coverage / (len(self.env.overall_jumpis) * 2)) * 100
@@ -86,6 +125,9 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
         # Save to results
         if "generations" not in self.env.results:
             self.env.results["generations"] = []
+        elif self.env.results["generations"] and self.env.results["generations"][-1]["generation"] == g + 1:
+            # The population of a resumed run is executed again for the generation of the checkpoint
+            self.env.results["generations"].pop()
 
         self.env.results["generations"].append({
             "generation": g + 1,
@@ -97,9 +139,16 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
         })
 
         if len(self.env.code_coverage) == self.env.previous_code_coverage_length:
+            start = time.perf_counter()
+            solver = self.env.metrics.times["solver"]
             self.symbolic_execution(population.indv_generator)
+            # The solver is reported as its own phase, so that the phases add up
+            self.env.metrics.add_time("symbolic_execution", time.perf_counter() - start - (self.env.metrics.times["solver"] - solver))
             if self.symbolic_execution_count == settings.MAX_SYMBOLIC_EXECUTION:
                 del population.individuals[:]
+                if self.env.corpus:
+                    # Keep half of the population from the corpus instead of rediscovering its coverage
+                    population.individuals.extend(self.env.corpus.sample(population.size // 2))
                 population.init()
                 self.logger.debug("Resetting population...")
                 self.execute(population, engine)
@@ -110,37 +159,65 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
 
         self.env.previous_code_coverage_length = len(self.env.code_coverage)
 
+        # Seconds spent per phase since the previous generation
+        times = dict(self.env.metrics.times)
+        self.env.results["generations"][-1]["phases"] = {phase: times[phase] - self.phase_times.get(phase, 0) for phase in sorted(times)}
+        self.phase_times = times
+
+        if self.results_log:
+            self.results_log.append([dict(self.env.results["generations"][-1], contract=self.env.contract_name, record="generation")] + self.new_error_records())
+
+        if self.env.metrics_reporter:
+            self.env.metrics_reporter.report(g + 1, population, self.env)
+
+        if self.env.checkpoint and self.env.checkpoint.due():
+            self.env.checkpoint.save(self.env, population.indv_generator, population, engine, self)
+
     def execution_function(self, indv, env: FuzzingEnvironment):
         env.unique_individuals.add(indv.hash)
 
         # Initialize metric
         branches = {}
-        indv.data_dependencies = []
+        data_dependencies = {}
+        edges = {}
         contract_address = None
+        code_coverage_length = len(env.code_coverage)
+        branch_coverage_length = len(env.branch_coverage)
+        covered_branches = set()
+        # Shortest distance to the targets of the basic blocks entered
+        distance = None
+        target_pcs = env.target_pcs
+        cost = 0
+        data_dependencies_changed = False
+        perf_counter = time.perf_counter
+        times = env.metrics.times
 
         env.detector_executor.initialize_detectors()
 
-        for transaction_index, test in enumerate(indv.solution):
+        for transaction_index, transaction in enumerate(indv.solution):
 
-            transaction = test["transaction"]
-
-            _function_hash = transaction["data"][:10] if transaction["data"].startswith("0x") else transaction["data"][:8]
+            _function_hash = transaction.data[:10] if transaction.data.startswith("0x") else transaction.data[:8]
             _function_hash = "fallback" if _function_hash == '' else _function_hash
             _array_size_indexes = dict()
 
-            if transaction["to"] is None and contract_address is not None:
-                transaction["to"] = contract_address
+            if transaction.to is None and contract_address is not None:
+                # Transactions are shared between clones, replace instead of updating
+                transaction = transaction.replace(to=contract_address)
+                indv.solution[transaction_index] = transaction
 
-            if transaction["to"] is None:
+            if transaction.to is None:
                 continue
 
+            start = perf_counter()
             try:
-                result = env.instrumented_evm.deploy_transaction(test)
+                result = env.instrumented_evm.deploy_transaction(transaction)
             except ValidationError as e:
                 self.logger.error("Validation error in %s : %s (ignoring for now)", indv.hash, e)
                 continue
+            finally:
+                times["execution"] += perf_counter() - start
 
-            if not result.is_error and transaction["to"] == b'':
+            if not result.is_error and transaction.to == b'':
                 contract_address = encode_hex(result.msg.storage_address)
                 self.logger.debug("(%s - %d) Contract deployed at %s", indv.hash, transaction_index, contract_address)
 
@@ -152,6 +229,11 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
                 env.children_code_coverage[child_computation.msg.to].update([x["pc"] for x in child_computation.trace])
 
             env.nr_of_transactions += 1
+            cost += len(result.trace)
+
+            if indv.chromosome[transaction_index]["arguments"][0] != "constructor":
+                for edge, hits in result.edges.items():
+                    edges[edge] = edges.get(edge, 0) + hits
 
             previous_instruction = None
             previous_branch = []
@@ -162,11 +244,15 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
 
             for i, instruction in enumerate(result.trace):
 
+                start = perf_counter()
                 env.symbolic_taint_analyzer.propagate_taint(instruction, contract_address)
+                taint_end = perf_counter()
 
                 env.detector_executor.run_detectors(previous_instruction, instruction, env.results["errors"],
                                                 env.symbolic_taint_analyzer.get_tainted_record(index=-2), indv, env, previous_branch,
                                                 transaction_index)
+                times["taint"] += taint_end - start
+                times["detectors"] += perf_counter() - taint_end
 
                 # If constructor, we don't have to take into account the constructor inputs because they will be part of the
                 # state. We don't have to compute the code coverage, because the code is not the deployed one. We don't need
@@ -175,7 +261,13 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
                     continue
 
                 # Code coverage
-                env.code_coverage.add(hex(instruction["pc"]))
+                env.code_coverage.add(instruction["pc"])
+
+                if target_pcs and instruction["pc"] in target_pcs:
+                    distance = 0
+                    if instruction["pc"] not in env.reached_targets:
+                        env.reached_targets[instruction["pc"]] = time.time() - env.execution_begin
+                        self.logger.info("Target %s reached after %.2f seconds", hex(instruction["pc"]), env.reached_targets[instruction["pc"]])
 
                 # Dynamically build control flow graph
                 if env.cfg:
@@ -192,28 +284,30 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
                         sha3[instruction["stack"][-1][1]] = sha3[previous_instruction["stack"][-2][1]]
 
                 if instruction["op"] == "JUMPI":
-                    jumpi_pc = hex(instruction["pc"])
+                    jumpi_pc = instruction["pc"]
                     if jumpi_pc not in env.visited_branches:
                         env.visited_branches[jumpi_pc] = {}
-                    if jumpi_pc not in branches:
-                        branches[jumpi_pc] = dict()
 
                     destination = convert_stack_value_to_int(instruction["stack"][-1])
                     jumpi_condition = convert_stack_value_to_int(instruction["stack"][-2])
 
+                    # Remember the destination that was not taken
                     if jumpi_condition == 0:
-                        # don't jump, but increase pc
-                        branches[jumpi_pc][hex(destination)] = False
-                        branches[jumpi_pc][hex(instruction["pc"] + 1)] = True
+                        branches[jumpi_pc] = destination
                     else:
-                        # jump to destination
-                        branches[jumpi_pc][hex(destination)] = True
-                        branches[jumpi_pc][hex(instruction["pc"] + 1)] = False
+                        branches[jumpi_pc] = jumpi_pc + 1
+                    env.branch_coverage.add(jumpi_pc, jumpi_condition)
+                    if target_pcs:
+                        block_distance = env.target_distances.get(jumpi_pc + 1 if jumpi_condition == 0 else destination)
+                        if block_distance is not None and (distance is None or block_distance < distance):
+                            distance = block_distance
+                    covered_branches.add(jumpi_pc << 1 | (1 if jumpi_condition else 0))
 
                     env.visited_branches[jumpi_pc][jumpi_condition] = {}
                     env.visited_branches[jumpi_pc][jumpi_condition]["indv_hash"] = indv.hash
                     env.visited_branches[jumpi_pc][jumpi_condition]["chromosome"] = indv.chromosome
                     env.visited_branches[jumpi_pc][jumpi_condition]["transaction_index"] = transaction_index
+                    env.visited_branches[jumpi_pc][jumpi_condition]["not_taken"] = branches[jumpi_pc]
 
                     tainted_record = env.symbolic_taint_analyzer.check_taint(instruction=instruction)
                     if tainted_record and tainted_record.stack and tainted_record.stack[-2]:
@@ -243,9 +337,15 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
                         storage_slot = convert_stack_value_to_int(instruction["stack"][-1])
 
                     _function_hash = indv.chromosome[transaction_index]["arguments"][0]
+                    if _function_hash not in data_dependencies:
+                        data_dependencies[_function_hash] = {"read": set(), "write": set()}
+                    data_dependencies[_function_hash]["read"].add(storage_slot)
                     if _function_hash not in self.env.data_dependencies:
                         self.env.data_dependencies[_function_hash] = {"read": set(), "write": set()}
-                    self.env.data_dependencies[_function_hash]["read"].add(storage_slot)
+                    if storage_slot not in self.env.data_dependencies[_function_hash]["read"]:
+                        self.env.data_dependencies[_function_hash]["read"].add(storage_slot)
+                        self.env.all_reads.add(storage_slot)
+                        data_dependencies_changed = True
 
                 elif instruction["op"] == "SSTORE":
                     if instruction["stack"][-1][1] in sha3:
@@ -260,9 +360,14 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
                         storage_slot = convert_stack_value_to_int(instruction["stack"][-1])
 
                     _function_hash = indv.chromosome[transaction_index]["arguments"][0]
+                    if _function_hash not in data_dependencies:
+                        data_dependencies[_function_hash] = {"read": set(), "write": set()}
+                    data_dependencies[_function_hash]["write"].add(storage_slot)
                     if _function_hash not in self.env.data_dependencies:
                         self.env.data_dependencies[_function_hash] = {"read": set(), "write": set()}
-                    self.env.data_dependencies[_function_hash]["write"].add(storage_slot)
+                    if storage_slot not in self.env.data_dependencies[_function_hash]["write"]:
+                        self.env.data_dependencies[_function_hash]["write"].add(storage_slot)
+                        data_dependencies_changed = True
 
                 # If something goes wrong, we need to clean some pools
                 elif instruction["op"] in ["REVERT", "INVALID", "ASSERTFAIL"]:
@@ -281,13 +386,13 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
 
                                 elif _str_var.startswith("callvalue_"):
                                     _function_hash = indv.chromosome[transaction_index]["arguments"][0]
-                                    _amount = transaction["value"]
+                                    _amount = transaction.value
                                     if _amount == 0 or _amount == 1:
                                         indv.generator.remove_amount_from_pool(_function_hash, _amount)
 
                                 elif _str_var.startswith("caller_"):
                                     _function_hash = indv.chromosome[transaction_index]["arguments"][0]
-                                    _caller = transaction["from"]
+                                    _caller = transaction.sender
                                     indv.generator.remove_account_from_pool(_function_hash, _caller)
 
                                 elif _str_var.startswith("gas_"):
@@ -450,13 +555,76 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
 
             env.symbolic_taint_analyzer.clear_callstack()
 
-            if not result.is_error and not transaction["to"]:
+            if not result.is_error and not transaction.to:
                 contract_address = encode_hex(result.msg.storage_address)
 
         env.individual_branches[indv.hash] = branches
+        env.individual_distances[indv.hash] = distance
+
+        # Individuals are credited with the edges and hit-count buckets they discovered, new edges count twice
+        new_edges, new_buckets = env.edge_coverage.add(edges)
+        env.individual_edges[indv.hash] = 2 * new_edges + new_buckets
+
+        if env.corpus is not None:
+            env.corpus.record(covered_branches, cost)
+            if len(env.code_coverage) != code_coverage_length or len(env.branch_coverage) != branch_coverage_length or new_edges:
+                env.corpus.add(indv, covered_branches, cost)
+
+        if settings.EXECUTION_CACHE_SIZE > 0:
+            self.execution_cache[indv.hash] = (branches, data_dependencies, distance, covered_branches, cost)
+            if len(self.execution_cache) > settings.EXECUTION_CACHE_SIZE:
+                self.execution_cache.popitem(last=False)
+
+        # Cached fitness values are only valid for the coverage they were computed on
+        if len(env.code_coverage) != code_coverage_length or data_dependencies_changed or (env.args.edge_coverage and (new_edges or new_buckets)):
+            env.coverage_version += 1
+            env.memoized_fitness.clear()
 
         env.symbolic_taint_analyzer.clear_storage()
+        start = perf_counter()
         env.instrumented_evm.restore_from_snapshot()
+        times["snapshot_restore"] += perf_counter() - start
+
+    def replay_execution(self, indv, env: FuzzingEnvironment):
+        '''
+        Reuse the result of a previous execution of the same individual. Code
+        coverage, visited branches and detected errors are global and have
+        been recorded by that execution already. So have its edges, which
+        are no longer new and earn no edge credit, as on a re-execution. The
+        replay still counts as an execution for the statistics of the corpus.
+        '''
+        env.unique_individuals.add(indv.hash)
+        branches, data_dependencies, distance, covered_branches, cost = self.execution_cache[indv.hash]
+        self.execution_cache.move_to_end(indv.hash)
+        if env.corpus is not None:
+            env.corpus.record(covered_branches, cost)
+        env.individual_branches[indv.hash] = branches
+        env.individual_edges[indv.hash] = 0
+        env.individual_distances[indv.hash] = distance
+
+        data_dependencies_changed = False
+        for _function_hash in data_dependencies:
+            if _function_hash not in env.data_dependencies:
+                env.data_dependencies[_function_hash] = {"read": set(), "write": set()}
+            reads = data_dependencies[_function_hash]["read"] - env.data_dependencies[_function_hash]["read"]
+            writes = data_dependencies[_function_hash]["write"] - env.data_dependencies[_function_hash]["write"]
+            if reads or writes:
+                env.data_dependencies[_function_hash]["read"].update(reads)
+                env.data_dependencies[_function_hash]["write"].update(writes)
+                env.all_reads.update(reads)
+                data_dependencies_changed = True
+        if data_dependencies_changed:
+            env.coverage_version += 1
+            env.memoized_fitness.clear()
+
+    def new_error_records(self):
+        records = []
+        for pc, errors in self.env.results["errors"].items():
+            for error in errors:
+                if (pc, error["type"]) not in self.reported_errors:
+                    self.reported_errors.add((pc, error["type"]))
+                    records.append(dict(error, contract=self.env.contract_name, record="error", pc=pc))
+        return records
 
     def get_coverage_with_children(self, children_code_coverage, code_coverage):
         code_coverage = len(code_coverage)
@@ -465,21 +633,43 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
             code_coverage += len(child_cc)
         return code_coverage
 
+    def solve(self, solver):
+        start = time.perf_counter()
+        check = solver.check()
+        self.env.metrics.add_time("solver", time.perf_counter() - start)
+        self.env.metrics.increment("solver_calls")
+        return check
+
     def symbolic_execution(self, indv_generator):
         if not self.env.args.constraint_solving:
             return
 
-        for index, pc in enumerate(self.env.visited_branches):
-            self.logger.debug("b(%d) pc : %s - visited branches : %s", index, pc,
+        visited_branches = list(self.env.visited_branches)
+        if self.env.target_pcs:
+            # Pools keep the most recent values, so the branches whose other side is closest to the targets are solved last
+            def flip_distance(pc):
+                if len(self.env.visited_branches[pc]) != 1:
+                    return 0
+                _d = next(iter(self.env.visited_branches[pc].values()))
+                return self.env.target_distances.get(_d.get("not_taken"), float("inf"))
+            visited_branches.sort(key=flip_distance, reverse=True)
+
+        for index, pc in enumerate(visited_branches):
+            self.logger.debug("b(%d) pc : %s - visited branches : %s", index, hex(pc),
                                self.env.visited_branches[pc].keys())
 
             if len(self.env.visited_branches[pc]) != 1:
                 continue
 
+            # The condition is constant, the other side cannot be taken
+            if self.env.cfg and pc in self.env.cfg.constant_branches:
+                self.env.metrics.increment("solver_skips")
+                continue
+
             branch, _d = next(iter(self.env.visited_branches[pc].items()))
 
             if not _d["expression"]:
-                self.logger.debug("No expression for b(%d) pc : %s", index, pc)
+                self.logger.debug("No expression for b(%d) pc : %s", index, hex(pc))
                 continue
 
             negated_branch = simplify(Not(_d["expression"][-1]))
@@ -493,12 +683,12 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
                 self.env.solver.add(expression)
             self.env.solver.add(negated_branch)
 
-            check = self.env.solver.check()
+            check = self.solve(self.env.solver)
 
             if check == sat:
                 model = self.env.solver.model()
 
-                self.logger.debug("(%s) Symbolic Solution to branch %s: %s ", _d["indv_hash"], pc,
+                self.logger.debug("(%s) Symbolic Solution to branch %s: %s ", _d["indv_hash"], hex(pc),
                                   "; ".join([str(x)+" ("+str(model[x])+")" for x in model]))
 
                 for variable in model:
@@ -514,7 +704,7 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
                         for expression_index in range(len(_d["expression"]) - 1):
                             opt.add(_d["expression"][expression_index])
                         opt.add(negated_branch)
-                        check = opt.check()
+                        check = self.solve(opt)
                         if check == sat:
                             opt_model = opt.model()
                             balance = int(opt_model[variable].as_long())
@@ -625,7 +815,7 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
                                 if variable_2 != variable and str(variable_2).startswith("callvalue"):
                                     callvalue_index = int(str(variable_2).split("_")[1])
                                     self.env.solver.add(BitVec(str(variable_2), 256) == BitVecVal(int(_d["chromosome"][callvalue_index]["amount"]), 256))
-                            check = self.env.solver.check()
+                            check = self.solve(self.env.solver)
                             if check == sat:
                                 model = self.env.solver.model()
                                 argument = model[variable].as_long()
@@ -653,7 +843,7 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
                         for expression_index in range(len(_d["expression"]) - 1):
                             opt.add(_d["expression"][expression_index])
                         opt.add(negated_branch)
-                        check = opt.check()
+                        check = self.solve(opt)
                         if check == sat:
                             opt_model = opt.model()
                             array_size = opt_model[variable].as_long()
@@ -691,6 +881,13 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
             self.env.memoized_symbolic_execution[negated_branch] = True
 
     def finalize(self, population, engine):
+        if self.env.checkpoint:
+            self.env.checkpoint.join()
+        if self.env.metrics_reporter:
+            self.env.metrics_reporter.close()
+        if self.env.timeline:
+            self.env.timeline.close(self.env)
+
         execution_end = time.time()
         execution_delta = execution_end - self.env.execution_begin
 
@@ -708,15 +905,16 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
                                                                 len(self.env.code_coverage),
                                                                 len(self.env.overall_pcs))
         self.logger.info(msg)
-        branch_coverage = 0
-        for pc in self.env.visited_branches:
-            branch_coverage += len(self.env.visited_branches[pc])
+        branch_coverage = len(self.env.branch_coverage)
         branch_coverage_percentage = 0
         if len(self.env.overall_jumpis) > 0:
             branch_coverage_percentage = (branch_coverage / (len(self.env.overall_jumpis) * 2)) * 100
         msg = 'Total branch coverage: \t {:.2f}% ({}/{})'.format(branch_coverage_percentage,
                                                                  branch_coverage, len(self.env.overall_jumpis) * 2)
         self.logger.info(msg)
+        if self.env.target_pcs:
+            msg = 'Targets reached: \t\t {}/{}'.format(len(self.env.reached_targets), len(self.env.target_pcs))
+            self.logger.info(msg)
         msg = 'Total execution time: \t {:.2f} seconds'.format(execution_delta)
         self.logger.info(msg)
         msg = 'Total memory consumption: \t {:.2f} MB'.format(psutil.Process(os.getpid()).memory_info().rss/1024/1024)
@@ -736,13 +934,31 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
         self.env.results["branch_coverage"] = {"percentage": branch_coverage_percentage,
                                                "covered": branch_coverage,
                                                "total": len(self.env.overall_jumpis) * 2}
+        self.env.results["edge_coverage"] = {"edges": len(self.env.edge_coverage),
+                                             "buckets": self.env.edge_coverage.covered}
         self.env.results["execution_time"] = execution_delta
+        self.env.results["phases"] = {phase: self.env.metrics.times[phase] for phase in sorted(self.env.metrics.times)}
+        self.env.results["counters"] = {counter: self.env.metrics.counts[counter] for counter in sorted(self.env.metrics.counts)}
         self.env.results["memory_consumption"] = psutil.Process(os.getpid()).memory_info().rss/1024/1024
         self.env.results["address_under_test"] = self.env.population.indv_generator.contract
         self.env.results["seed"] = self.env.seed
+        if self.env.target_pcs:
+            self.env.results["targets"] = {pc: self.env.reached_targets.get(pc) for pc in sorted(self.env.target_pcs)}
+
+        if self.exploit_minimizer:
+            self.exploit_minimizer.join()
 
         #  Write results to file
-        if self.env.args.results:
+        if self.results_log:
+            records = self.new_error_records()
+            for pc, errors in self.env.results["errors"].items():
+                for error in errors:
+                    if "minimized_individual" in error:
+                        records.append({"contract": self.env.contract_name, "record": "minimized", "pc": pc, "type": error["type"], "individual": error["minimized_individual"]})
+            summary = {key: value for key, value in self.env.results.items() if key not in ("errors", "generations")}
+            records.append(dict(summary, contract=self.env.contract_name, record="summary", source=self.env.args.source))
+            self.results_log.append(records)
+        elif self.env.args.results:
             results = {}
             if self.env.args.results.lower().endswith(".json"):
                 if os.path.exists(self.env.args.results):
@@ -759,5 +975,6 @@ class ExecutionTraceAnalyzer(OnTheFlyAnalysis):
                 with open(self.env.args.results + '/' + os.path.splitext(os.path.basename(self.env.contract_name))[0] + '.json', 'w') as file:
                     json.dump(results, file)
 
-        diff = list(set(self.env.code_coverage).symmetric_difference(set([hex(x) for x in self.env.overall_pcs])))
+        diff = list(set(self.env.code_coverage.to_hex()).symmetric_difference(set([hex(x) for x in self.env.overall_pcs])))
         self.logger.debug("Instructions not executed: %s", sorted(diff))
+        self.logger.debug("Branches visited: %s", self.env.branch_coverage.to_hex())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+import collections
+import multiprocessing
+
+from engine.components import Individual
+from utils import settings
+from utils.utils import initialize_logger
+
+class ExploitMinimizer:
+    '''
+    Reduces the transaction sequence of a reported error to a minimal sequence
+    that still reproduces it, using delta debugging (ddmin).
+
+    Every candidate sequence is replayed against the snapshot of the
+    InstrumentedEVM. The replays run in a forked worker process, which gets its
+    own copy of the EVM, the fuzzing environment and the generator, so that
+    minimization neither blocks nor interferes with the fuzzing loop. The
+    worker is not forked while the checkpoint writer is running, since the
+    child would inherit the locks that thread holds. At most
+    MINIMIZATION_QUEUE_SIZE errors wait for minimization, and waiting for them
+    at the end of the run is bounded by the global timeout.
+    '''
+    def __init__(self, analyzer):
+        self.logger = initialize_logger("Minimizer")
+        self.analyzer = analyzer
+        self.env = analyzer.env
+        self.pending = collections.deque()
+        self.worker = None
+
+    def submit(self, individual, pc, type):
+        if len(individual.chromosome) < 2:
+            return
+        if len(self.pending) >= settings.MINIMIZATION_QUEUE_SIZE:
+            self.logger.warning("Minimization queue is full, reporting %s at pc %s without minimizing it", type, pc)
+            return
+        self.pending.append((list(individual.chromosome), individual.generator, pc, type))
+        self.poll()
+
+    def poll(self):
+        if self.worker:
+            process, connection, pc, type = self.worker
+            if not connection.poll():
+                return
+            try:
+                solution = connection.recv()
+            except EOFError:
+                solution = None
+            connection.close()
+            process.join()
+            self.worker = None
+            if solution is not None:
+                self._store(pc, type, solution)
+        if self.pending and not self._checkpoint_running():
+            chromosome, generator, pc, type = self.pending.popleft()
+            context = multiprocessing.get_context("fork")
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=self._minimize, args=(chromosome, generator, pc, type, sender), daemon=True)
+            process.start()
+            sender.close()
+            self.worker = (process, receiver, pc, type)
+
+    def join(self, timeout=None):
+        timeout = settings.MINIMIZATION_TIMEOUT if timeout is None else timeout
+        if settings.GLOBAL_TIMEOUT:
+            timeout = min(timeout, settings.GLOBAL_TIMEOUT - (time.time() - self.env.execution_begin))
+        end = time.time() + max(0, timeout)
+        while (self.worker or self.pending) and time.time() < end:
+            if self.worker:
+                self.worker[1].poll(max(0, end - time.time()))
+            elif self._checkpoint_running():
+                self.env.checkpoint.join()
+            self.poll()
+        if self.worker:
+            process, connection, pc, type = self.worker
+            process.terminate()
+            connection.close()
+            self.worker = None
+            self.logger.warning("Minimization timed out, reporting %s at pc %s without minimizing it", type, pc)
+        while self.pending:
+            _, _, pc, type = self.pending.popleft()
+            self.logger.warning("Minimization timed out, reporting %s at pc %s without minimizing it", type, pc)
+
+    def _checkpoint_running(self):
+        checkpoint = self.env.checkpoint
+        return bool(checkpoint and checkpoint.writer and checkpoint.writer.is_alive())
+
+    def _store(self, pc, type, solution):
+        for error in self.env.results["errors"].get(pc, []):
+            if error["type"] == type:
+                error["minimized_individual"] = solution
+                self.logger.debug("Minimized %s at pc %s from %d to %d transaction(s)", type, pc, len(error["individual"]), len(solution))
+
+    def _minimize(self, chromosome, generator, pc, type, connection):
+        # Executed in the forked worker, keep the replays quiet.
+        self.env.detector_executor.logger.setLevel(logging.CRITICAL)
+        self.analyzer.logger.setLevel(logging.CRITICAL)
+        try:
+            chromosome = self.ddmin(chromosome, lambda c: self._reproduces(c, generator, pc, type))
+            connection.send([transaction.to_dict() for transaction in Individual(generator=generator).init(chromosome=chromosome).solution])
+        except Exception:
+            connection.send(None)
+        finally:
+            connection.close()
+
+    def _reproduces(self, chromosome, generator, pc, type):
+        self.env.results["errors"] = {}
+        individual = Individual(generator=generator).init(chromosome=list(chromosome))
+        self.analyzer.execution_function(individual, self.env)
+        return any(error["type"] == type for error in self.env.results["errors"].get(pc, []))
+
+    @staticmethod
+    def ddmin(chromosome, reproduces):
+        '''
+        Zeller's delta debugging: returns a 1-minimal subsequence of chromosome
+        for which reproduces() still holds.
+        '''
+        n = 2
+        while len(chromosome) >= 2:
+            chunk = len(chromosome) // n
+            subsets = [chromosome[i:i + chunk] for i in range(0, chunk * (n - 1), chunk)]
+            subsets.append(chromosome[chunk * (n - 1):])
+            reduced = False
+            for subset in subsets:
+                if reproduces(subset):
+                    chromosome, n, reduced = subset, 2, True
+                    break
+            if not reduced and n > 2:
+                for i in range(len(subsets)):
+                    complement = [gene for j, subset in enumerate(subsets) if j != i for gene in subset]
+                    if reproduces(complement):
+                        chromosome, n, reduced = complement, max(n - 1, 2), True
+                        break
+            if not reduced:
+                if n >= len(chromosome):
+                    break
+                n = min(n * 2, len(chromosome))
+        return chromosome
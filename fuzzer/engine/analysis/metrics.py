@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import psutil
+import threading
+import socketserver
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from utils.utils import initialize_logger
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class MetricsReporter:
+    '''
+    Publishes the metrics of every generation as a line of JSON appended to a
+    file, and/or in the Prometheus text format on a local HTTP endpoint
+    (http://127.0.0.1:<port>/metrics) that serves the latest generation.
+    '''
+    PREFIX = "confuzzius_"
+
+    def __init__(self, path=None, port=None, labels=None):
+        self.logger = initialize_logger("Metrics")
+        self.labels = labels if labels else dict()
+        self.file = open(path, "a") if path else None
+        self.latest = dict()
+        self.previous = None
+        self.process = psutil.Process(os.getpid())
+        self.server = None
+        if port:
+            reporter = self
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = reporter.to_prometheus().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+            self.server = _Server(("127.0.0.1", port), Handler)
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+            self.logger.info("Serving metrics on http://127.0.0.1:%d/metrics", port)
+
+    def report(self, generation, population, env):
+        now = time.time()
+        times, counts = env.metrics.snapshot()
+        if self.previous is None:
+            self.previous = (env.execution_begin, 0, dict(), dict())
+        previous_time, previous_transactions, previous_times, previous_counts = self.previous
+        self.previous = (now, env.nr_of_transactions, times, counts)
+
+        def delta(values, previous_values, name):
+            return values.get(name, 0) - previous_values.get(name, 0)
+
+        def rate(hits, total):
+            total = delta(counts, previous_counts, total)
+            return delta(counts, previous_counts, hits) / total if total else 0.0
+
+        elapsed = now - previous_time
+        metrics = {
+            "generation": generation,
+            "time": now - env.execution_begin,
+            "transactions": env.nr_of_transactions,
+            "unique_transactions": len(env.unique_individuals),
+            "executions_per_second": (env.nr_of_transactions - previous_transactions) / elapsed if elapsed > 0 else 0.0,
+            "code_coverage": len(env.code_coverage),
+            "branch_coverage": len(env.branch_coverage),
+            "errors": sum(len(errors) for errors in env.results["errors"].values()),
+            "execution_cache_hit_rate": rate("execution_cache_hits", "execution_cache_lookups"),
+            "fitness_cache_hit_rate": rate("fitness_cache_hits", "fitness_evaluations"),
+            "population_diversity": len(set(individual.hash for individual in population.individuals)) / max(1, len(population.individuals)),
+            "rss_bytes": self.process.memory_info().rss
+        }
+        for phase in sorted(times):
+            metrics[phase + "_seconds"] = delta(times, previous_times, phase)
+        self.latest = metrics
+        if self.file:
+            self.file.write(json.dumps(dict(self.labels, **metrics)) + "\n")
+            self.file.flush()
+
+    def to_prometheus(self):
+        labels = ",".join('{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"')) for key, value in self.labels.items())
+        lines = []
+        for name, value in self.latest.items():
+            lines.append("# TYPE {}{} gauge".format(MetricsReporter.PREFIX, name))
+            lines.append("{}{}{{{}}} {}".format(MetricsReporter.PREFIX, name, labels, value))
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        if self.file:
+            self.file.close()
+        if self.server:
+            self.server.shutdown()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import math
+import time
+
+from utils import settings
+
+class Timeline:
+    '''
+    Coverage and unique findings sampled at fixed intervals of wall-clock
+    time, independent of the length of the generations, and appended as rows
+    of a CSV file. The contract and the seed are repeated on every row, so
+    that the files of many runs can be concatenated and compared.
+    '''
+    COLUMNS = ["contract", "seed", "time", "transactions", "code_coverage", "branch_coverage", "edge_coverage", "findings", "finding_types"]
+
+    def __init__(self, path, contract, seed, interval=None):
+        self.contract = contract
+        self.seed = seed
+        self.interval = interval if interval else settings.TIMELINE_INTERVAL
+        self.file = open(path, "a", newline="")
+        self.writer = csv.writer(self.file)
+        if self.file.tell() == 0:
+            self.writer.writerow(Timeline.COLUMNS)
+        # Index of the next row, whose time is index * interval
+        self.next_sample = None
+
+    def sample(self, env):
+        '''
+        Writes a row for every interval that elapsed since the previous call,
+        which is cheap enough to be called before every execution: nothing
+        changed since then, so the state is the one at those points in time.
+        '''
+        elapsed = time.time() - env.execution_begin
+        if self.next_sample is None:
+            # A resumed run continues where the checkpoint left off
+            self.next_sample = math.ceil(elapsed / self.interval)
+        if elapsed < self.next_sample * self.interval:
+            return
+        types = set()
+        findings = 0
+        for errors in env.results["errors"].values():
+            findings += len(errors)
+            types.update(error["type"] for error in errors)
+        while self.next_sample * self.interval <= elapsed:
+            self.writer.writerow([self.contract, self.seed, self.next_sample * self.interval, env.nr_of_transactions, len(env.code_coverage),
+                                  len(env.branch_coverage), len(env.edge_coverage), findings, len(types)])
+            self.next_sample += 1
+        self.file.flush()
+
+    def close(self, env):
+        self.sample(env)
+        self.file.close()
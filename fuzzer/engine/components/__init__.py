@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from .corpus import Corpus
+from .gene import Gene, Transaction
 from .generator import Generator
 from .individual import Individual
 from .population import Population
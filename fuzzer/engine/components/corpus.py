@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import random
+
+from utils import settings
+from utils.utils import initialize_logger
+
+from .gene import Gene
+from .generator import Generator, CircularSet
+from .individual import Individual
+
+class CorpusEntry():
+    __slots__ = ("individual", "branches", "cost", "picks")
+
+    def __init__(self, individual, branches, cost):
+        self.individual = individual
+        self.branches = branches
+        self.cost = cost
+        self.picks = 0
+
+class Corpus():
+    '''
+    Individuals that increased the coverage, kept across generations and
+    population resets. Entries are picked according to a power schedule: an
+    entry gets more energy the rarer the branches it covers and the cheaper
+    it is to execute, and loses energy every time it is picked.
+
+    If a directory is given, every individual added to the corpus is written
+    to it as individuals/<hash>.json, and the generator pools (including the
+    values found by constraint solving) to generator.json, so that a later
+    run can be seeded from it. The JSON files tag the values JSON lacks
+    (bytes, sets, dicts with non-string keys, genes).
+    '''
+    def __init__(self, size=None, directory=None):
+        self.logger = initialize_logger("Corpus")
+        self.size = settings.CORPUS_SIZE if size is None else size
+        self.directory = directory
+        if self.directory:
+            os.makedirs(os.path.join(self.directory, "individuals"), exist_ok=True)
+        self.entries = dict()
+        # Number of executions that covered each branch direction
+        self.branch_hits = dict()
+        self.executions = 0
+        self.total_cost = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, individual):
+        return individual.hash in self.entries
+
+    def record(self, branches, cost):
+        '''
+        Account for an execution covering the given branch directions at the
+        given cost (number of executed instructions).
+        '''
+        for branch in branches:
+            self.branch_hits[branch] = self.branch_hits.get(branch, 0) + 1
+        self.executions += 1
+        self.total_cost += cost
+
+    def add(self, individual, branches, cost):
+        if self.size <= 0 or individual.hash in self.entries:
+            return
+        if len(self.entries) >= self.size:
+            weakest = min(self.entries, key=lambda hash: self.energy(self.entries[hash]))
+            del self.entries[weakest]
+        self.entries[individual.hash] = CorpusEntry(individual.clone(), frozenset(branches), max(1, cost))
+        if self.directory:
+            self.save_individual(individual)
+
+    def energy(self, entry):
+        rarity = sum(1.0 / self.branch_hits[branch] for branch in entry.branches if branch in self.branch_hits)
+        speed = min(4.0, max(0.25, (self.total_cost / max(1, self.executions)) / entry.cost))
+        return (rarity + 1.0 / max(1, self.executions)) * speed / (1 + entry.picks)
+
+    def sample(self, k):
+        '''
+        Pick k individuals according to their energy and return clones of them.
+        '''
+        if not self.entries or k <= 0:
+            return []
+        entries = list(self.entries.values())
+        picked = random.choices(entries, weights=[self.energy(entry) for entry in entries], k=k)
+        for entry in picked:
+            entry.picks += 1
+        return [entry.individual.clone() for entry in picked]
+
+    def save_individual(self, individual):
+        Corpus.write_json(os.path.join(self.directory, "individuals", individual.hash + ".json"),
+                          {"chromosome": [Corpus.encode(gene) for gene in individual.chromosome]})
+
+    def save_generator(self, generator):
+        Corpus.write_json(os.path.join(self.directory, "generator.json"),
+                          {"interface": generator.interface, "pools": {pool: Corpus.encode(getattr(generator, pool)) for pool in Generator.POOLS}})
+
+    def load(self, generator):
+        '''
+        Restore the generator pools and return the individuals of the corpus
+        directory, most recent first (at most the size of the corpus).
+        '''
+        path = os.path.join(self.directory, "generator.json")
+        if os.path.exists(path):
+            with open(path) as file:
+                state = json.load(file)
+            if state["interface"] != generator.interface:
+                self.logger.warning("Corpus %s was created for a different interface, ignoring it", self.directory)
+                return []
+            for pool in Generator.POOLS:
+                if pool in state["pools"]:
+                    setattr(generator, pool, Corpus.decode(state["pools"][pool]))
+
+        directory = os.path.join(self.directory, "individuals")
+        files = sorted((os.path.join(directory, file) for file in os.listdir(directory) if file.endswith(".json")), key=os.path.getmtime, reverse=True)
+        individuals = []
+        for file in files[:self.size]:
+            with open(file) as f:
+                chromosome = [Corpus.decode(gene) for gene in json.load(f)["chromosome"]]
+            if not all(gene["arguments"][0] in generator.interface or gene["arguments"][0] == "fallback" for gene in chromosome):
+                continue
+            # Addresses of a new deployment may differ from the ones of the run that saved the corpus
+            chromosome = [gene.replace(contract=generator.bytecode if gene["arguments"][0] == "constructor" else generator.contract) for gene in chromosome]
+            individuals.append(Individual(generator=generator).init(chromosome=chromosome))
+        self.logger.info("Loaded %d individual(s) from corpus %s", len(individuals), self.directory)
+        return individuals
+
+    @staticmethod
+    def write_json(path, data):
+        # Write to a temporary file first, so that a crash never leaves a truncated file behind
+        with open(path + ".tmp", "w") as file:
+            json.dump(data, file)
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def encode(value):
+        if isinstance(value, Gene):
+            return {"gene": {field: Corpus.encode(value[field]) for field in value}}
+        if isinstance(value, CircularSet):
+            return {"set": [Corpus.encode(element) for element in value], "size": value.size}
+        if isinstance(value, bytearray):
+            return {"bytearray": value.hex()}
+        if isinstance(value, bytes):
+            return {"bytes": value.hex()}
+        if isinstance(value, dict):
+            return {"dict": [[Corpus.encode(key), Corpus.encode(element)] for key, element in value.items()]}
+        if isinstance(value, (list, tuple)):
+            return [Corpus.encode(element) for element in value]
+        return value
+
+    @staticmethod
+    def decode(value):
+        if isinstance(value, list):
+            return [Corpus.decode(element) for element in value]
+        if not isinstance(value, dict):
+            return value
+        if "gene" in value:
+            return Gene(**{field: Corpus.decode(element) for field, element in value["gene"].items()})
+        if "set" in value:
+            return CircularSet(set_size=value["size"], initial_set=[Corpus.decode(element) for element in value["set"]])
+        if "bytearray" in value:
+            return bytearray.fromhex(value["bytearray"])
+        if "bytes" in value:
+            return bytes.fromhex(value["bytes"])
+        return {Corpus.decode(key): Corpus.decode(element) for key, element in value["dict"]}
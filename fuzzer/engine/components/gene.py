@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+class Gene():
+    '''
+    Immutable transaction record of a chromosome. Fields are read like dict
+    keys (gene["arguments"], "timestamp" in gene); unset fields are missing
+    keys. Use replace() to derive a modified gene.
+    '''
+    __slots__ = ("account", "contract", "amount", "arguments", "blocknumber", "timestamp", "gaslimit",
+                 "call_return", "extcodesize", "returndatasize", "balance")
+
+    def __init__(self, **fields):
+        for field, value in fields.items():
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, field, value):
+        raise AttributeError("Gene is immutable, use replace()")
+
+    def __getitem__(self, field):
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field)
+
+    def __contains__(self, field):
+        return field in Gene.__slots__ and hasattr(self, field)
+
+    def __iter__(self):
+        return (field for field in Gene.__slots__ if hasattr(self, field))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        return isinstance(other, Gene) and self.items() == other.items()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "Gene(" + ", ".join(field + "=" + repr(value) for field, value in self.items()) + ")"
+
+    def __reduce__(self):
+        return (Gene._from_items, (self.items(),))
+
+    @staticmethod
+    def _from_items(items):
+        return Gene(**dict(items))
+
+    def get(self, field, default=None):
+        return getattr(self, field, default)
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self]
+
+    def replace(self, **fields):
+        gene = Gene(**dict(self.items()))
+        for field, value in fields.items():
+            object.__setattr__(gene, field, value)
+        return gene
+
+class Transaction():
+    '''
+    Decoded gene, as executed by InstrumentedEVM.deploy_transaction.
+    '''
+    __slots__ = ("sender", "to", "value", "gaslimit", "data", "timestamp", "blocknumber",
+                 "balance", "call_return", "extcodesize", "returndatasize")
+
+    def __init__(self, sender, to, value, gaslimit, data, timestamp=None, blocknumber=None,
+                 balance=None, call_return=None, extcodesize=None, returndatasize=None):
+        self.sender = sender
+        self.to = to
+        self.value = value
+        self.gaslimit = gaslimit
+        self.data = data
+        self.timestamp = timestamp
+        self.blocknumber = blocknumber
+        self.balance = balance
+        self.call_return = call_return
+        self.extcodesize = extcodesize
+        self.returndatasize = returndatasize
+
+    def __eq__(self, other):
+        return isinstance(other, Transaction) and all(getattr(self, field) == getattr(other, field) for field in Transaction.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "Transaction("+ ", ".join(field + "=" + repr(getattr(self, field)) for field in Transaction.__slots__) + ")"
+
+    def __reduce__(self):
+        return (Transaction, tuple(getattr(self, field) for field in Transaction.__slots__))
+
+    def replace(self, **fields):
+        transaction = Transaction(*(getattr(self, field) for field in Transaction.__slots__))
+        for field, value in fields.items():
+            setattr(transaction, field, value)
+        return transaction
+
+    def to_dict(self):
+        '''
+        The transaction in the format in which solutions are reported.
+        '''
+        input = {"transaction": {"from": self.sender, "to": self.to, "value": self.value, "gaslimit": self.gaslimit, "data": self.data},
+                 "block": {}, "global_state": {}, "environment": {}}
+        if self.timestamp is not None:
+            input["block"]["timestamp"] = self.timestamp
+        if self.blocknumber is not None:
+            input["block"]["blocknumber"] = self.blocknumber
+        if self.balance is not None:
+            input["global_state"]["balance"] = self.balance
+        if self.call_return:
+            input["global_state"]["call_return"] = self.call_return
+        if self.extcodesize:
+            input["global_state"]["extcodesize"] = self.extcodesize
+        if self.returndatasize is not None:
+            input["environment"]["returndatasize"] = self.returndatasize
+        return input
@@ -6,6 +6,7 @@ import collections
 
 from utils import settings
 from utils.utils import *
+from .gene import Gene
 
 UINT_MAX = {
     1: int("0xff", 16),
@@ -112,46 +113,122 @@ INT_MIN = {
     32: int("-0x8000000000000000000000000000000000000000000000000000000000000000", 16)
 }
 
-MAX_RING_BUFFER_LENGTH = 10
 MAX_ARRAY_LENGTH = 2
 
 class CircularSet:
-    def __init__(self, set_size=MAX_RING_BUFFER_LENGTH, initial_set=None):
-        self._q = collections.deque(maxlen=set_size)
+    '''
+    Bounded set of values that are handed out round-robin, most recently added
+    first. Backed by an ordered dict, so that add, discard and rotation are O(1).
+    '''
+    def __init__(self, set_size=None, initial_set=None):
+        self._size = settings.MAX_RING_BUFFER_LENGTH if set_size is None else set_size
+        self._q = collections.OrderedDict()
         if initial_set:
-            self._q.extend(initial_set)
+            for value in initial_set:
+                self.add(value)
 
     @property
     def empty(self):
         return len(self._q) == 0
 
     def add(self, value):
-        if value not in self._q:
-            self._q.append(value)
-        else:
-            self._q.remove(value)
-            self._q.append(value)
+        key = CircularSet._key(value)
+        if key in self._q:
+            self._q.move_to_end(key)
+        elif len(self._q) >= self._size:
+            self._q.popitem(last=False)
+        self._q[key] = value
 
     def head_and_rotate(self):
-        value = self._q[-1]
-        self._q.rotate(1)
+        key, value = next(reversed(self._q.items()))
+        self._q.move_to_end(key, last=False)
         return value
 
     def discard(self, value):
-        if value in self._q:
-            self._q.remove(value)
+        self._q.pop(CircularSet._key(value), None)
+
+    def __len__(self):
+        return len(self._q)
+
+    def __iter__(self):
+        # Oldest value first, so that adding them in order restores the set.
+        return iter(list(self._q.values()))
+
+    @property
+    def size(self):
+        return self._size
+
+    def __repr__(self):
+        return repr(list(self._q.values()))
+
+    @staticmethod
+    def _key(value):
+        # Values are compared by equality, e.g. a bytearray matches its bytes.
+        if isinstance(value, bytearray):
+            return bytes(value)
+        if isinstance(value, list):
+            return tuple(CircularSet._key(element) for element in value)
+        return value
+
+
+class ArgumentType:
+    '''
+    Solidity type of a function argument, parsed once: kind, size in bytes
+    (integers and fixed-size bytes) and array dimensions (None if dynamic).
+    '''
+    __slots__ = ["type", "kind", "size", "dimensions", "sampler", "element_sampler"]
+
+    ARRAY_DIMENSIONS = re.compile(r"\[(.*?)\]")
+
+    def __init__(self, type):
+        self.type = type
+        self.size = None
+        self.dimensions = []
+        self.sampler = None
+        self.element_sampler = None
+
+        if "[" in type and "]" in type:
+            self.dimensions = [int(size) if size else None for size in ArgumentType.ARRAY_DIMENSIONS.findall(type)]
+
+        base = type.split("[")[0].split(" ")[0]
+        if base.startswith("bool"):
+            self.kind = "bool"
+        elif base.startswith("uint"):
+            self.kind = "uint"
+            self.size = int(int(base.replace("uint", "") or 256) / 8)
+        elif base.startswith("int"):
+            self.kind = "int"
+            self.size = int(int(base.replace("int", "") or 256) / 8)
+        elif base.startswith("address"):
+            self.kind = "address"
+        elif base.startswith("string"):
+            self.kind = "string"
+        elif base.startswith("bytes") and base[5:].isdigit():
+            self.kind = "fixed_bytes"
+            self.size = int(base[5:])
+        elif base.startswith("bytes"):
+            self.kind = "bytes"
+        else:
+            self.kind = None
 
     def __repr__(self):
-        return repr(self._q)
+        return self.type
 
 
 class Generator:
-    def __init__(self, interface, bytecode, accounts, contract):
+    # Pools of values learned during fuzzing (e.g. from constraint solving)
+    POOLS = ("accounts_pool", "amounts_pool", "arguments_pool", "timestamp_pool", "blocknumber_pool", "balance_pool",
+             "callresult_pool", "gaslimit_pool", "extcodesize_pool", "returndatasize_pool", "argument_array_sizes_pool",
+             "strings_pool", "bytes_pool")
+
+    def __init__(self, interface, bytecode, accounts, contract, metrics=None):
         self.logger = initialize_logger("Generator")
         self.interface = interface
         self.bytecode = bytecode
         self.accounts = accounts
         self.contract = contract
+        # Phase timers of the fuzzing environment, individuals account their decoding time in it
+        self.metrics = metrics
 
         # Pools
         self.function_circular_buffer = CircularSet(set_size=len(self.interface), initial_set=set(self.interface))
@@ -169,6 +246,13 @@ class Generator:
         self.strings_pool = CircularSet()
         self.bytes_pool = CircularSet()
 
+        # Argument types parsed once per function
+        self.argument_types = {function: [self.compile_argument_type(type) for type in types] for function, types in self.interface.items()}
+
+        # ABI encoders and encoded arguments shared by all individuals
+        self.encoders = {}
+        self.encoded_arguments = {}
+
     def generate_random_individual(self):
         individual = []
 
@@ -176,67 +260,74 @@ class Generator:
             arguments = ["constructor"]
             for index in range(len(self.interface["constructor"])):
                 arguments.append(self.get_random_argument(self.interface["constructor"][index], "constructor", index))
-            individual.append({
-                "account": self.get_random_account("constructor"),
-                "contract": self.bytecode,
-                "amount": self.get_random_amount("constructor"),
-                "arguments": arguments,
-                "blocknumber": self.get_random_blocknumber("constructor"),
-                "timestamp": self.get_random_timestamp("constructor"),
-                "gaslimit": self.get_random_gaslimit("constructor"),
-                "returndatasize": dict()
-            })
+            individual.append(Gene(
+                account=self.get_random_account("constructor"),
+                contract=self.bytecode,
+                amount=self.get_random_amount("constructor"),
+                arguments=arguments,
+                blocknumber=self.get_random_blocknumber("constructor"),
+                timestamp=self.get_random_timestamp("constructor"),
+                gaslimit=self.get_random_gaslimit("constructor"),
+                returndatasize=dict()
+            ))
 
         function, argument_types = self.get_random_function_with_argument_types()
         arguments = [function]
         for index in range(len(argument_types)):
             arguments.append(self.get_random_argument(argument_types[index], function, index))
-        individual.append({
-            "account": self.get_random_account(function),
-            "contract": self.contract,
-            "amount": self.get_random_amount(function),
-            "arguments": arguments,
-            "blocknumber": self.get_random_blocknumber(function),
-            "timestamp": self.get_random_timestamp(function),
-            "gaslimit": self.get_random_gaslimit(function),
-            "call_return": dict(),
-            "extcodesize": dict(),
-            "returndatasize": dict()
-        })
+        account = self.get_random_account(function)
+        amount = self.get_random_amount(function)
+        blocknumber = self.get_random_blocknumber(function)
+        timestamp = self.get_random_timestamp(function)
+        gaslimit = self.get_random_gaslimit(function)
 
         address, call_return_value = self.get_random_callresult_and_address(function)
-        individual[-1]["call_return"] = {address: call_return_value}
+        call_return = {address: call_return_value}
 
         address, extcodesize_value = self.get_random_extcodesize_and_address(function)
-        individual[-1]["extcodesize"] = {address: extcodesize_value}
+        extcodesize = {address: extcodesize_value}
 
         address, value = self.get_random_returndatasize_and_address(function)
-        individual[-1]["returndatasize"] = {address: value}
+        returndatasize = {address: value}
+
+        individual.append(Gene(
+            account=account,
+            contract=self.contract,
+            amount=amount,
+            arguments=arguments,
+            blocknumber=blocknumber,
+            timestamp=timestamp,
+            gaslimit=gaslimit,
+            call_return=call_return,
+            extcodesize=extcodesize,
+            returndatasize=returndatasize
+        ))
 
         return individual
 
     def generate_random_input(self):
-        input = {}
-
         function, argument_types = self.get_random_function_with_argument_types()
         arguments = [function]
         for index in range(len(argument_types)):
             arguments.append(self.get_random_argument(argument_types[index], function, index))
-        input = {
-            "account": self.get_random_account(function),
-            "contract": self.contract,
-            "amount": self.get_random_amount(function),
-            "arguments": arguments,
-            "blocknumber": self.get_random_blocknumber(function),
-            "timestamp": self.get_random_timestamp(function),
-            "gaslimit": self.get_random_gaslimit(function),
-            "returndatasize": dict()
-        }
+        account = self.get_random_account(function)
+        amount = self.get_random_amount(function)
+        blocknumber = self.get_random_blocknumber(function)
+        timestamp = self.get_random_timestamp(function)
+        gaslimit = self.get_random_gaslimit(function)
 
         address, value = self.get_random_returndatasize_and_address(function)
-        input["returndatasize"] = {address: value}
 
-        return input
+        return Gene(
+            account=account,
+            contract=self.contract,
+            amount=amount,
+            arguments=arguments,
+            blocknumber=blocknumber,
+            timestamp=timestamp,
+            gaslimit=gaslimit,
+            returndatasize={address: value}
+        )
 
     def get_random_function_with_argument_types(self):
         function_hash = self.function_circular_buffer.head_and_rotate()
@@ -544,225 +635,139 @@ class Generator:
         return self.arguments_pool[function][argument_index].head_and_rotate()
 
     def get_random_argument(self, type, function, argument_index):
-        # Boolean
-        if type.startswith("bool"):
-            # Array
-            if "[" in type and "]" in type:
-                sizes = self._get_array_sizes(argument_index, function, type)
-                array = []
-                for _ in range(sizes[0]):
-                    if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                        if self._get_random_argument_from_pool(function, argument_index) == 0:
-                            array.append(False)
-                        else:
-                            array.append(True)
-                    else:
-                        if random.randint(0, 1) == 0:
-                            array.append(False)
-                        else:
-                            array.append(True)
-                if len(sizes) > 1:
-                    new_array = []
-                    for _ in range(sizes[1]):
-                        new_array.append(array)
-                    array = new_array
-                return array
-            # Single value
-            else:
-                if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                    if self._get_random_argument_from_pool(function, argument_index) == 0:
-                        return False
-                    return True
-                else:
-                    if random.randint(0, 1) == 0:
-                        return False
-                    return True
-
-        # Unsigned integer
-        elif type.startswith("uint"):
-            bytes = int(int(type.replace("uint", "").split("[")[0]) / 8)
-            # Array
-            if "[" in type and "]" in type:
-                sizes = self._get_array_sizes(argument_index, function, type)
-                array = []
-                for _ in range(sizes[0]):
-                    if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                        array.append(self._get_random_argument_from_pool(function, argument_index))
-                    else:
-                        array.append(self.get_random_unsigned_integer(0, UINT_MAX[bytes]))
-                if len(sizes) > 1:
-                    new_array = []
-                    for _ in range(sizes[1]):
-                        new_array.append(array)
-                    array = new_array
-                return array
-            # Single value
-            else:
-                if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                    return self._get_random_argument_from_pool(function, argument_index)
-                return self.get_random_unsigned_integer(0, UINT_MAX[bytes])
-
-        # Signed integer
-        elif type.startswith("int"):
-            bytes = int(int(type.replace("int", "").split("[")[0]) / 8)
-            # Array
-            if "[" in type and "]" in type:
-                sizes = self._get_array_sizes(argument_index, function, type)
-                array = []
-                for _ in range(sizes[0]):
-                    if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                        array.append(self._get_random_argument_from_pool(function, argument_index))
-                    else:
-                        array.append(self.get_random_signed_integer(INT_MIN[bytes], INT_MAX[bytes]))
-                if len(sizes) > 1:
-                    new_array = []
-                    for _ in range(sizes[1]):
-                        new_array.append(array)
-                    array = new_array
-                return array
-            # Single value
-            else:
-                if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                    return self._get_random_argument_from_pool(function, argument_index)
-                return self.get_random_signed_integer(INT_MIN[bytes], INT_MAX[bytes])
-
-        # Address
-        elif type.startswith("address"):
-            # Array
-            if "[" in type and "]" in type:
-                sizes = self._get_array_sizes(argument_index, function, type)
-                array = []
-                for _ in range(sizes[0]):
-                    if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                        array.append(self._get_random_argument_from_pool(function, argument_index))
-                    else:
-                        array.append(random.choice(self.accounts))
-                if len(sizes) > 1:
-                    new_array = []
-                    for _ in range(sizes[1]):
-                        new_array.append(array)
-                    array = new_array
-                return array
-            # Single value
-            else:
-                if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                    return self._get_random_argument_from_pool(function, argument_index)
-                return random.choice(self.accounts)
-
-        # String
-        elif type.startswith("string"):
-            # Array
-            if "[" in type and "]" in type:
-                sizes = self._get_array_sizes(argument_index, function, type)
-                array = []
-                for _ in range(sizes[0]):
-                    array.append(self.get_string(random.randint(0, MAX_ARRAY_LENGTH)))
-                if len(sizes) > 1:
-                    new_array = []
-                    for _ in range(sizes[1]):
-                        new_array.append(array)
-                    array = new_array
-                return array
-            # Single value
-            else:
-                if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                    return self._get_random_argument_from_pool(function, argument_index)
-                if self.strings_pool.empty:
-                    self.add_string_to_pool(self.get_string(0))
-                    self.add_string_to_pool(self.get_string(1))
-                    self.add_string_to_pool(self.get_string(32))
-                    self.add_string_to_pool(self.get_string(33))
-                return self.get_random_string_from_pool()
-
-        # Bytes1 ... Bytes32
-        elif type.startswith("bytes1") or \
-             type.startswith("bytes2") or \
-             type.startswith("bytes3") or \
-             type.startswith("bytes4") or \
-             type.startswith("bytes5") or \
-             type.startswith("bytes6") or \
-             type.startswith("bytes7") or \
-             type.startswith("bytes8") or \
-             type.startswith("bytes9") or \
-             type.startswith("bytes10") or \
-             type.startswith("bytes11") or \
-             type.startswith("bytes12") or \
-             type.startswith("bytes13") or \
-             type.startswith("bytes14") or \
-             type.startswith("bytes15") or \
-             type.startswith("bytes16") or \
-             type.startswith("bytes17") or \
-             type.startswith("bytes18") or \
-             type.startswith("bytes19") or \
-             type.startswith("bytes20") or \
-             type.startswith("bytes21") or \
-             type.startswith("bytes22") or \
-             type.startswith("bytes23") or \
-             type.startswith("bytes24") or \
-             type.startswith("bytes25") or \
-             type.startswith("bytes26") or \
-             type.startswith("bytes27") or \
-             type.startswith("bytes28") or \
-             type.startswith("bytes29") or \
-             type.startswith("bytes30") or \
-             type.startswith("bytes31") or \
-             type.startswith("bytes32"):
-            length = int(type.replace("bytes", "").split("[")[0])
-            # Array
-            if "[" in type and "]" in type:
-                sizes = self._get_array_sizes(argument_index, function, type)
-                array = []
-                for _ in range(sizes[0]):
-                    if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                        array.append(self._get_random_argument_from_pool(function, argument_index))
-                    else:
-                        array.append(self.get_random_bytes(length))
-                if len(sizes) > 1:
-                    new_array = []
-                    for _ in range(sizes[1]):
-                        new_array.append(array)
-                    array = new_array
-                return array
-            # Single value
-            else:
-                if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                    return self._get_random_argument_from_pool(function, argument_index)
-                return self.get_random_bytes(random.randint(0, length))
-
-        # Bytes
-        elif type.startswith("bytes"):
-            # Array
-            if "[" in type and "]" in type:
-                sizes = self._get_array_sizes(argument_index, function, type)
-                array = []
-                for _ in range(sizes[0]):
-                    array.append(self.get_random_bytes(random.randint(0, MAX_ARRAY_LENGTH)))
-                if len(sizes) > 1:
-                    new_array = []
-                    for _ in range(sizes[1]):
-                        new_array.append(array)
-                    array = new_array
-                return array
-            # Single value
-            else:
-                if function in self.arguments_pool and argument_index in self.arguments_pool[function]:
-                    return self._get_random_argument_from_pool(function, argument_index)
-                if self.bytes_pool.empty:
-                    self.add_bytes_to_pool(self.get_random_bytes(0))
-                    self.add_bytes_to_pool(self.get_random_bytes(1))
-                    self.add_bytes_to_pool(self.get_random_bytes(32))
-                    self.add_bytes_to_pool(self.get_random_bytes(33))
-                return self.get_random_bytes_from_pool()
-
-        # Unknown type
+        if function in self.argument_types and argument_index < len(self.argument_types[function]):
+            argument_type = self.argument_types[function][argument_index]
         else:
-            self.logger.error("Unsupported type: "+str(type))
-
-    def _get_array_sizes(self, argument_index, function, type):
+            argument_type = self.compile_argument_type(type)
+        return argument_type.sampler(argument_type, function, argument_index)
+
+    def compile_argument_type(self, type):
+        '''
+        Parse a Solidity type once into an ArgumentType descriptor and bind
+        the sampler used to generate its values.
+        '''
+        argument_type = ArgumentType(type)
+        if argument_type.kind == "bool":
+            argument_type.element_sampler = self._get_random_bool
+        elif argument_type.kind == "uint":
+            argument_type.element_sampler = self._get_random_uint
+        elif argument_type.kind == "int":
+            argument_type.element_sampler = self._get_random_int
+        elif argument_type.kind == "address":
+            argument_type.element_sampler = self._get_random_address
+        elif argument_type.kind == "string":
+            argument_type.element_sampler = self._get_random_string_element
+        elif argument_type.kind == "fixed_bytes":
+            argument_type.element_sampler = self._get_random_fixed_bytes_element
+        elif argument_type.kind == "bytes":
+            argument_type.element_sampler = self._get_random_bytes_element
+        else:
+            argument_type.sampler = self._get_unsupported_argument
+            return argument_type
+
+        if argument_type.dimensions:
+            argument_type.sampler = self._get_random_array
+        elif argument_type.kind == "string":
+            argument_type.sampler = self._get_random_string
+        elif argument_type.kind == "fixed_bytes":
+            argument_type.sampler = self._get_random_fixed_bytes
+        elif argument_type.kind == "bytes":
+            argument_type.sampler = self._get_random_bytes
+        else:
+            argument_type.sampler = argument_type.element_sampler
+        return argument_type
+
+    def _argument_in_pool(self, function, argument_index):
+        return function in self.arguments_pool and argument_index in self.arguments_pool[function]
+
+    def _get_random_array(self, argument_type, function, argument_index):
+        sizes = self._get_array_sizes(argument_index, function, argument_type.dimensions)
+        array = []
+        for _ in range(sizes[0]):
+            array.append(argument_type.element_sampler(argument_type, function, argument_index))
+        if len(sizes) > 1:
+            new_array = []
+            for _ in range(sizes[1]):
+                new_array.append(array)
+            array = new_array
+        return array
+
+    # Boolean
+    def _get_random_bool(self, argument_type, function, argument_index):
+        if self._argument_in_pool(function, argument_index):
+            if self._get_random_argument_from_pool(function, argument_index) == 0:
+                return False
+            return True
+        if random.randint(0, 1) == 0:
+            return False
+        return True
+
+    # Unsigned integer
+    def _get_random_uint(self, argument_type, function, argument_index):
+        if self._argument_in_pool(function, argument_index):
+            return self._get_random_argument_from_pool(function, argument_index)
+        return self.get_random_unsigned_integer(0, UINT_MAX[argument_type.size])
+
+    # Signed integer
+    def _get_random_int(self, argument_type, function, argument_index):
+        if self._argument_in_pool(function, argument_index):
+            return self._get_random_argument_from_pool(function, argument_index)
+        return self.get_random_signed_integer(INT_MIN[argument_type.size], INT_MAX[argument_type.size])
+
+    # Address
+    def _get_random_address(self, argument_type, function, argument_index):
+        if self._argument_in_pool(function, argument_index):
+            return self._get_random_argument_from_pool(function, argument_index)
+        return random.choice(self.accounts)
+
+    # String
+    def _get_random_string_element(self, argument_type, function, argument_index):
+        return self.get_string(random.randint(0, MAX_ARRAY_LENGTH))
+
+    def _get_random_string(self, argument_type, function, argument_index):
+        if self._argument_in_pool(function, argument_index):
+            return self._get_random_argument_from_pool(function, argument_index)
+        if self.strings_pool.empty:
+            self.add_string_to_pool(self.get_string(0))
+            self.add_string_to_pool(self.get_string(1))
+            self.add_string_to_pool(self.get_string(32))
+            self.add_string_to_pool(self.get_string(33))
+        return self.get_random_string_from_pool()
+
+    # Bytes1 ... Bytes32
+    def _get_random_fixed_bytes_element(self, argument_type, function, argument_index):
+        if self._argument_in_pool(function, argument_index):
+            return self._get_random_argument_from_pool(function, argument_index)
+        return self.get_random_bytes(argument_type.size)
+
+    def _get_random_fixed_bytes(self, argument_type, function, argument_index):
+        if self._argument_in_pool(function, argument_index):
+            return self._get_random_argument_from_pool(function, argument_index)
+        return self.get_random_bytes(random.randint(0, argument_type.size))
+
+    # Bytes
+    def _get_random_bytes_element(self, argument_type, function, argument_index):
+        return self.get_random_bytes(random.randint(0, MAX_ARRAY_LENGTH))
+
+    def _get_random_bytes(self, argument_type, function, argument_index):
+        if self._argument_in_pool(function, argument_index):
+            return self._get_random_argument_from_pool(function, argument_index)
+        if self.bytes_pool.empty:
+            self.add_bytes_to_pool(self.get_random_bytes(0))
+            self.add_bytes_to_pool(self.get_random_bytes(1))
+            self.add_bytes_to_pool(self.get_random_bytes(32))
+            self.add_bytes_to_pool(self.get_random_bytes(33))
+        return self.get_random_bytes_from_pool()
+
+    # Unknown type
+    def _get_unsupported_argument(self, argument_type, function, argument_index):
+        self.logger.error("Unsupported type: "+str(argument_type.type))
+
+    def _get_array_sizes(self, argument_index, function, dimensions):
         sizes = []
-        for size in re.compile(r"\[(.*?)\]").findall(type):
+        for size in dimensions:
             # Dynamic array
-            if size == "":
+            if size is None:
                 if function in self.argument_array_sizes_pool \
                         and argument_index in self.argument_array_sizes_pool[function]:
                     sizes.append(self._get_parameter_array_size_from_pool(function, argument_index))
@@ -770,7 +775,7 @@ class Generator:
                     sizes.append(random.randint(0, MAX_ARRAY_LENGTH))
             # Fixed size array
             else:
-                sizes.append(int(size))
+                sizes.append(size)
         return sizes
 
     @staticmethod
@@ -2,13 +2,18 @@
 # -*- coding: utf-8 -*-
 
 import sys
+import time
 import random
+import hashlib
 
-from copy import deepcopy, copy
-from eth_abi import encode_abi
+from eth_abi.encoding import TupleEncoder
+from eth_abi.registry import registry
 from eth_abi.exceptions import EncodingTypeError, ValueOutOfBounds, ParseError
 
 from utils.utils import initialize_logger
+from .gene import Gene, Transaction
+
+MAX_ENCODED_ARGUMENTS = 100000
 
 class Individual():
     def __init__(self, generator):
@@ -16,60 +21,90 @@ class Individual():
         self.chromosome = []
         self.solution = []
         self.generator = generator
+        self.data_dependency_bitsets = None
+        self.gene_digests = []
+        self._hash = None
 
     @property
     def hash(self):
-        if not self.solution:
-            self.solution = self.decode()
-        return str(hash(str([tx for tx in self.solution])))
+        '''
+        Stable 128-bit digest of the chromosome, independent of the seed and
+        of PYTHONHASHSEED. Combines per-gene digests, which are only
+        recomputed for genes invalidated by a mutation.
+        '''
+        if self._hash is None:
+            for i, gene in enumerate(self.chromosome):
+                if self.gene_digests[i] is None:
+                    self.gene_digests[i] = Individual.digest(gene)
+            self._hash = hashlib.blake2b(b"".join(self.gene_digests), digest_size=16).hexdigest()
+        return self._hash
+
+    def invalidate(self, gene_index=None):
+        '''
+        Invalidate the hash after the gene at gene_index (or the whole
+        chromosome, if no index is given) has been modified.
+        '''
+        self._hash = None
+        if gene_index is None or len(self.gene_digests) != len(self.chromosome):
+            self.gene_digests = [None] * len(self.chromosome)
+        else:
+            self.gene_digests[gene_index] = None
 
-    def init(self, chromosome=None):
+    def init(self, chromosome=None, solution=None):
         if not chromosome:
             self.chromosome = self.generator.generate_random_individual()
         else:
             self.chromosome = chromosome
-        self.solution = self.decode()
+        self.invalidate()
+        self.solution = solution if solution is not None else self.decode()
         return self
 
     def clone(self):
+        '''
+        Genes are never modified in place (see replace_gene), so a clone
+        shares them, as well as their decoded transactions, with its parent.
+        '''
         indv = self.__class__(generator=self.generator)
-        indv.init(chromosome=deepcopy(self.chromosome))
+        indv.chromosome = list(self.chromosome)
+        indv.solution = list(self.solution)
+        indv.gene_digests = list(self.gene_digests)
+        indv._hash = self._hash
         return indv
 
+    def replace_gene(self, gene_index, **fields):
+        '''
+        Copy-on-write update of a gene: the gene at gene_index is replaced by
+        a new gene with the given fields, which is then decoded again.
+        '''
+        self.chromosome[gene_index] = self.chromosome[gene_index].replace(**fields)
+        self.invalidate(gene_index)
+        start = time.perf_counter()
+        self.solution[gene_index] = self.decode_gene(gene_index)
+        self.add_decode_time(start)
+
     def decode(self):
-        solution = []
-        for i in range(len(self.chromosome)):
-            transaction = {}
-            transaction["from"] = copy(self.chromosome[i]["account"])
-            transaction["to"] = copy(self.chromosome[i]["contract"])
-            transaction["value"] = copy(self.chromosome[i]["amount"])
-            transaction["gaslimit"] = copy(self.chromosome[i]["gaslimit"])
-            transaction["data"] = self.get_transaction_data_from_chromosome(i)
-
-            block = {}
-            if "timestamp" in self.chromosome[i] and self.chromosome[i]["timestamp"] is not None:
-                block["timestamp"] = copy(self.chromosome[i]["timestamp"])
-            if "blocknumber" in self.chromosome[i] and self.chromosome[i]["blocknumber"] is not None:
-                block["blocknumber"] = copy(self.chromosome[i]["blocknumber"])
-
-            global_state = {}
-            if "balance" in self.chromosome[i] and self.chromosome[i]["balance"] is not None:
-                global_state["balance"] = copy(self.chromosome[i]["balance"])
-            if "call_return" in self.chromosome[i] and self.chromosome[i]["call_return"] is not None\
-                    and len(self.chromosome[i]["call_return"]) > 0:
-                global_state["call_return"] = copy(self.chromosome[i]["call_return"])
-            if "extcodesize" in self.chromosome[i] and self.chromosome[i]["extcodesize"] is not None\
-                    and len(self.chromosome[i]["extcodesize"]) > 0:
-                global_state["extcodesize"] = copy(self.chromosome[i]["extcodesize"])
-
-            environment = {}
-            if "returndatasize" in self.chromosome[i] and self.chromosome[i]["returndatasize"] is not None:
-                environment["returndatasize"] = copy(self.chromosome[i]["returndatasize"])
-
-            input = {"transaction":transaction, "block" : block, "global_state" : global_state, "environment": environment}
-            solution.append(input)
+        start = time.perf_counter()
+        solution = [self.decode_gene(i) for i in range(len(self.chromosome))]
+        self.add_decode_time(start)
         return solution
 
+    def add_decode_time(self, start):
+        # "decode" is a sub-phase, the engine subtracts it from the phase that decoded
+        if self.generator.metrics is not None:
+            self.generator.metrics.add_time("decode", time.perf_counter() - start)
+
+    def decode_gene(self, i):
+        gene = self.chromosome[i]
+        transaction = Transaction(gene["account"], gene["contract"], gene["amount"], gene["gaslimit"],
+                           self.get_transaction_data_from_chromosome(i),
+                           timestamp=gene.get("timestamp"),
+                           blocknumber=gene.get("blocknumber"),
+                           balance=gene.get("balance"),
+                           call_return=gene.get("call_return") or None,
+                           extcodesize=gene.get("extcodesize") or None,
+                           returndatasize=gene.get("returndatasize"))
+        return transaction
+
     def get_transaction_data_from_chromosome(self, chromosome_index):
         data = ""
         arguments = []
@@ -89,10 +124,44 @@ class Individual():
             else:
                 arguments.append(self.chromosome[chromosome_index]["arguments"][j])
         try:
-            argument_types = [argument_type.replace(" storage", "").replace(" memory", "") for argument_type in self.generator.interface[function]]
-            data += encode_abi(argument_types, arguments).hex()
+            data += self.encode_arguments(function, arguments)
         except Exception as e:
             self.logger.error("%s", e)
             self.logger.error("%s: %s -> %s", function, self.generator.interface[function], arguments)
             sys.exit(-6)
         return data
+
+    def encode_arguments(self, function, arguments):
+        '''
+        ABI-encode the arguments of a function call. Encoders are compiled
+        once per function and encodings are shared by all individuals of the
+        same generator, so unchanged genes are not encoded again.
+        '''
+        key = (function, Individual.freeze(arguments))
+        encoded_arguments = self.generator.encoded_arguments
+        if key in encoded_arguments:
+            return encoded_arguments[key]
+
+        if function not in self.generator.encoders:
+            argument_types = [argument_type.replace(" storage", "").replace(" memory", "") for argument_type in self.generator.interface[function]]
+            self.generator.encoders[function] = TupleEncoder(encoders=[registry.get_encoder(argument_type) for argument_type in argument_types])
+        data = self.generator.encoders[function](arguments).hex()
+
+        if len(encoded_arguments) >= MAX_ENCODED_ARGUMENTS:
+            encoded_arguments.clear()
+        encoded_arguments[key] = data
+        return data
+
+    @staticmethod
+    def digest(gene):
+        return hashlib.blake2b(repr(Individual.freeze(gene)).encode(), digest_size=8).digest()
+
+    @staticmethod
+    def freeze(argument):
+        if isinstance(argument, (dict, Gene)):
+            return tuple(sorted((repr(key), Individual.freeze(value)) for key, value in argument.items()))
+        if isinstance(argument, (list, tuple)):
+            return tuple(Individual.freeze(element) for element in argument)
+        if isinstance(argument, bytearray):
+            return bytes(argument)
+        return argument
@@ -117,6 +117,13 @@ class Population(object):
         '''
         self._updated = True
 
+    def clear_flag(self):
+        '''
+        Interface for resetting individual update flag to False, once the
+        current individuals have been processed (e.g. ranked).
+        '''
+        self._updated = False
+
     @property
     def updated(self):
         '''
@@ -17,6 +17,7 @@ import os
 from utils import settings
 
 from .components import Individual, Population
+from .environment import Metrics
 from .plugin_interfaces.operators import Selection, Crossover, Mutation
 from .plugin_interfaces.analysis import OnTheFlyAnalysis
 
@@ -95,7 +96,7 @@ class EvolutionaryFuzzingEngine(object):
                                      StatVar('ori_fmin'),
                                      StatVar('ori_fmean'))
 
-    def __init__(self, population, selection, crossover, mutation, fitness=None, analysis=None, mapping=None):
+    def __init__(self, population, selection, crossover, mutation, fitness=None, analysis=None, mapping=None, metrics=None):
         # Set logger.
         logger_name = 'engine.{}'.format(self.__class__.__name__)
         self.logger = logging.getLogger(logger_name)
@@ -109,6 +110,9 @@ class EvolutionaryFuzzingEngine(object):
         self.analysis = [] if analysis is None else [a() for a in analysis]
         self.mapping = mapping
 
+        # Time spent in the genetic operators.
+        self.metrics = Metrics() if metrics is None else metrics
+
         # Maxima and minima in population.
         self._fmax, self._fmin, self._fmean = None, None, None
         self._ori_fmax, self._ori_fmin, self._ori_fmean = None, None, None
@@ -119,6 +123,9 @@ class EvolutionaryFuzzingEngine(object):
         # Store current generation number.
         self.current_generation = -1  # Starts from 0.
 
+        # Seconds already spent before the run was resumed from a checkpoint.
+        self.elapsed_time = 0
+
         # Check parameters validity.
         self._check_parameters()
 
@@ -128,7 +135,7 @@ class EvolutionaryFuzzingEngine(object):
         Run the Genetic Algorithm optimization iteration with specified parameters.
         '''
         try:
-            execution_begin = time.time()
+            execution_begin = time.time() - self.elapsed_time
 
             if self.fitness is None:
                 raise AttributeError('No fitness function in GA engine')
@@ -136,10 +143,10 @@ class EvolutionaryFuzzingEngine(object):
             # Setup analysis objects.
             for a in self.analysis:
                 a.setup(ng=ng, engine=self)
-                a.register_step(g=-1, population=self.population, engine=self)
+                a.register_step(g=self.current_generation, population=self.population, engine=self)
 
-            # Enter evolution iteration.
-            g = 0
+            # Enter evolution iteration (a resumed run continues after the last generation).
+            g = self.current_generation + 1
             while g < ng or settings.GLOBAL_TIMEOUT:
                 if settings.GLOBAL_TIMEOUT and time.time() - execution_begin >= settings.GLOBAL_TIMEOUT:
                     break
@@ -162,13 +169,24 @@ class EvolutionaryFuzzingEngine(object):
                     print(output)"""
 
                 # Fill the new population.
+                perf_counter = time.perf_counter
+                times = self.metrics.times
                 for _ in range(size):
+                    start = perf_counter()
                     # Select father and mother.
                     parents = self.selection.select(self.population, fitness=self.fitness)
+                    selected = perf_counter()
+                    selected_decode = times["decode"]
                     # Crossover.
                     children = self.crossover.cross(*parents)
+                    crossed = perf_counter()
+                    crossed_decode = times["decode"]
                     # Mutation.
                     children = [self.mutation.mutate(child, self) for child in children]
+                    # Decoding is reported as its own phase, so that the phases add up
+                    times["selection"] += selected - start
+                    times["crossover"] += crossed - selected - (crossed_decode - selected_decode)
+                    times["mutation"] += perf_counter() - crossed - (times["decode"] - crossed_decode)
                     # Collect children.
                     indvs.extend(children)
 
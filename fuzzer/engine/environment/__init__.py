@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from .coverage import InstructionCoverage, BranchTable, EdgeCoverage
+from .metrics import Metrics
+
 class FuzzingEnvironment:
     def __init__(self, **kwargs) -> None:
         self.nr_of_transactions = 0
         self.unique_individuals = set()
-        self.code_coverage = set()
+        self.code_coverage = InstructionCoverage()
+        self.branch_coverage = BranchTable()
+        self.edge_coverage = EdgeCoverage()
         self.children_code_coverage = dict()
         self.previous_code_coverage_length = 0
 
@@ -16,7 +21,31 @@ class FuzzingEnvironment:
         self.memoized_symbolic_execution = dict()
 
         self.individual_branches = dict()
+        self.individual_edges = dict()
+
+        # Coverage-increasing individuals, see engine.components.Corpus
+        self.corpus = None
+
+        # Time spent per phase and event counters, published by engine.analysis.MetricsReporter
+        self.metrics = Metrics()
+        self.metrics_reporter = None
+
+        # Periodic checkpoint of the session, see engine.analysis.Checkpoint
+        self.checkpoint = None
+
+        # Coverage and findings over time, see engine.analysis.Timeline
+        self.timeline = None
+
+        # Directed fuzzing: pcs to reach, distance of every basic block to them and time at which they were reached
+        self.target_pcs = None
+        self.target_distances = dict()
+        self.individual_distances = dict()
+        self.reached_targets = dict()
 
         self.data_dependencies = dict()
+        self.all_reads = set()
+
+        # Incremented whenever the code coverage, the data dependencies or, for the edge fitness, the edge map grow
+        self.coverage_version = 0
 
         self.__dict__.update(kwargs)
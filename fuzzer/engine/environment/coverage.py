@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+class InstructionCoverage():
+    '''
+    Bitmap over the bytecode offsets of the contract under test. Offsets are
+    kept as integers, hex strings are only produced for reporting.
+    '''
+    def __init__(self, size=0):
+        self.bitmap = bytearray(size)
+        self.covered = 0
+
+    def add(self, pc):
+        if pc >= len(self.bitmap):
+            self.bitmap.extend(bytes(pc + 1 - len(self.bitmap)))
+        if self.bitmap[pc]:
+            return False
+        self.bitmap[pc] = 1
+        self.covered += 1
+        return True
+
+    def __contains__(self, pc):
+        return pc < len(self.bitmap) and self.bitmap[pc] == 1
+
+    def __len__(self):
+        return self.covered
+
+    def __iter__(self):
+        return (pc for pc, covered in enumerate(self.bitmap) if covered)
+
+    def to_hex(self):
+        return [hex(pc) for pc in self]
+
+class BranchTable():
+    '''
+    Visited directions of the JUMPIs of the contract under test, indexed by
+    the ordinal of the JUMPI in the bytecode. Bit 0 is set once the JUMPI
+    fell through, bit 1 once it jumped.
+    '''
+    FALL_THROUGH = 1
+    JUMP = 2
+
+    def __init__(self, jumpis=()):
+        self.ordinals = {pc: ordinal for ordinal, pc in enumerate(jumpis)}
+        self.directions = bytearray(len(self.ordinals))
+        self.covered = 0
+
+    def add(self, pc, condition):
+        ordinal = self.ordinals.get(pc)
+        if ordinal is None:
+            ordinal = self.ordinals[pc] = len(self.directions)
+            self.directions.append(0)
+        direction = BranchTable.JUMP if condition else BranchTable.FALL_THROUGH
+        if self.directions[ordinal] & direction:
+            return False
+        self.directions[ordinal] |= direction
+        self.covered += 1
+        return True
+
+    def __len__(self):
+        return self.covered
+
+    def to_hex(self):
+        return {hex(pc): [direction for direction, bit in ((0, BranchTable.FALL_THROUGH), (1, BranchTable.JUMP)) if self.directions[ordinal] & bit]
+                for pc, ordinal in self.ordinals.items() if self.directions[ordinal]}
+
+class EdgeCoverage():
+    '''
+    AFL-style edge coverage: for every (jump pc, destination pc) edge, the
+    logarithmic hit-count buckets reached by an individual so far.
+    '''
+    def __init__(self):
+        self.buckets = dict()
+        self.covered = 0
+
+    @staticmethod
+    def bucket(hits):
+        # 1, 2, 3, 4-7, 8-15, 16-31, 32-127, 128+
+        if hits <= 3:
+            return 1 << (hits - 1)
+        if hits < 32:
+            return 1 << hits.bit_length()
+        if hits < 128:
+            return 64
+        return 128
+
+    def add(self, edges):
+        '''
+        Merge the edge hit counts of an individual. Returns the number of new
+        edges and of new buckets of already known edges.
+        '''
+        new_edges, new_buckets = 0, 0
+        for edge, hits in edges.items():
+            bucket = EdgeCoverage.bucket(hits)
+            seen = self.buckets.get(edge)
+            if seen is None:
+                self.buckets[edge] = bucket
+                new_edges += 1
+            elif not seen & bucket:
+                self.buckets[edge] = seen | bucket
+                new_buckets += 1
+            else:
+                continue
+            self.covered += 1
+        return new_edges, new_buckets
+
+    def __len__(self):
+        return len(self.buckets)
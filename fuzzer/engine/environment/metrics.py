@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import collections
+
+class Metrics():
+    '''
+    Cumulative seconds spent in the phases of the fuzzer and event counters.
+    Updating them costs a dict lookup, so they are always on; per-generation
+    values are the difference of two snapshots.
+    '''
+    def __init__(self):
+        self.times = collections.defaultdict(float)
+        self.counts = collections.defaultdict(int)
+
+    def add_time(self, phase, seconds):
+        self.times[phase] += seconds
+
+    def increment(self, counter, n=1):
+        self.counts[counter] += n
+
+    def snapshot(self):
+        return dict(self.times), dict(self.counts)
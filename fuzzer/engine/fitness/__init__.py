@@ -1,35 +1,46 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-def fitness_function(indv, env):
-    block_coverage_fitness = compute_branch_coverage_fitness(env.individual_branches[indv.hash], env.code_coverage)
-    if env.args.data_dependency:
-        data_dependency_fitness = compute_data_dependency_fitness(indv, env.data_dependencies)
-        return block_coverage_fitness + data_dependency_fitness
-    return block_coverage_fitness
+from utils import settings
 
-def compute_branch_coverage_fitness(branches, pcs):
+def fitness_function(indv, env):
+    key = (indv.hash, env.coverage_version)
+    env.metrics.increment("fitness_evaluations")
+    if key in env.memoized_fitness:
+        env.metrics.increment("fitness_cache_hits")
+        fitness = env.memoized_fitness[key]
+    else:
+        fitness = compute_branch_coverage_fitness(env.individual_branches[indv.hash], env.code_coverage)
+        if env.args.data_dependency:
+            fitness += compute_data_dependency_fitness(indv, env.data_dependencies, env.all_reads)
+        if env.target_pcs:
+            fitness += compute_distance_fitness(env.individual_distances[indv.hash])
+        env.memoized_fitness[key] = fitness
+    # Edge credit is only earned by the execution that discovered the edges, it is not memoized
+    if env.args.edge_coverage:
+        fitness += env.individual_edges[indv.hash]
+    return fitness
+
+def compute_branch_coverage_fitness(branches, code_coverage):
     non_visited_branches = 0.0
 
     for jumpi in branches:
-        for destination in branches[jumpi]:
-            if not branches[jumpi][destination] and destination not in pcs:
-                non_visited_branches += 1
+        if branches[jumpi] not in code_coverage:
+            non_visited_branches += 1
 
     return non_visited_branches
 
-def compute_data_dependency_fitness(indv, data_dependencies):
-    data_dependency_fitness = 0.0
-    all_reads = set()
+def compute_distance_fitness(distance):
+    if distance is None:
+        return 0.0
+    return settings.DISTANCE_FITNESS_WEIGHT / (1 + distance)
 
-    for d in data_dependencies:
-        all_reads.update(data_dependencies[d]["read"])
+def compute_data_dependency_fitness(indv, data_dependencies, all_reads):
+    data_dependency_fitness = 0.0
 
     for i in indv.chromosome:
         _function_hash = i["arguments"][0]
         if _function_hash in data_dependencies:
-            for i in data_dependencies[_function_hash]["write"]:
-                if i in all_reads:
-                    data_dependency_fitness += 1
+            data_dependency_fitness += len(data_dependencies[_function_hash]["write"].intersection(all_reads))
 
     return data_dependency_fitness
@@ -37,9 +37,9 @@ class Crossover(Crossover):
             return _father, _mother
 
         child1 = Individual(generator=_father.generator)
-        child1.init(chromosome=_father.chromosome + _mother.chromosome)
+        child1.init(chromosome=_father.chromosome + _mother.chromosome, solution=_father.solution + _mother.solution)
 
         child2 = Individual(generator=_mother.generator)
-        child2.init(chromosome=_mother.chromosome + _father.chromosome)
+        child2.init(chromosome=_mother.chromosome + _father.chromosome, solution=_mother.solution + _father.solution)
 
         return child1, child2
@@ -48,13 +48,13 @@ class DataDependencyCrossover(Crossover):
 
         if not mother_reads.isdisjoint(father_writes):
             child1 = Individual(generator=_father.generator)
-            child1.init(chromosome=_father.chromosome + _mother.chromosome)
+            child1.init(chromosome=_father.chromosome + _mother.chromosome, solution=_father.solution + _mother.solution)
         else:
             child1 = _father
 
         if not father_reads.isdisjoint(mother_writes):
             child2 = Individual(generator=_mother.generator)
-            child2.init(chromosome=_mother.chromosome + _father.chromosome)
+            child2.init(chromosome=_mother.chromosome + _father.chromosome, solution=_mother.solution + _father.solution)
         else:
             child2 = _mother
 
@@ -20,16 +20,19 @@ class Mutation(Mutation):
         self.pm = pm
 
     def mutate(self, individual, engine):
-        for gene in individual.chromosome:
+        for gene_index, gene in enumerate(individual.chromosome):
+            # Genes are shared with the parents, collect the mutated fields
+            # and let the individual replace the gene (copy-on-write).
+            fields = {}
             # TRANSACTION
             function_hash = gene["arguments"][0]
             for element in gene:
                 if element == "account" and random.random() <= self.pm:
-                    gene["account"] = individual.generator.get_random_account(function_hash)
+                    fields["account"] = individual.generator.get_random_account(function_hash)
                 elif element == "amount" and random.random() <= self.pm:
-                    gene["amount"] = individual.generator.get_random_amount(function_hash)
+                    fields["amount"] = individual.generator.get_random_amount(function_hash)
                 elif element == "gaslimit" and random.random() <= self.pm:
-                    gene["gaslimit"] = individual.generator.get_random_gaslimit(function_hash)
+                    fields["gaslimit"] = individual.generator.get_random_gaslimit(function_hash)
                 else:
                     for argument_index in range(1, len(gene["arguments"])):
                         if random.random() > self.pm:
@@ -38,57 +41,61 @@ class Mutation(Mutation):
                         argument = individual.generator.get_random_argument(argument_type,
                                                                             function_hash,
                                                                             argument_index - 1)
-                        gene["arguments"][argument_index] = argument
+                        if "arguments" not in fields:
+                            fields["arguments"] = list(gene["arguments"])
+                        fields["arguments"][argument_index] = argument
 
             # BLOCK
             if "timestamp" in gene:
                 if random.random() <= self.pm:
-                    gene["timestamp"] = individual.generator.get_random_timestamp(function_hash)
+                    fields["timestamp"] = individual.generator.get_random_timestamp(function_hash)
             else:
-                gene["timestamp"] = individual.generator.get_random_timestamp(function_hash)
+                fields["timestamp"] = individual.generator.get_random_timestamp(function_hash)
 
             if "blocknumber" in gene:
                 if random.random() <= self.pm:
-                    gene["blocknumber"] = individual.generator.get_random_blocknumber(function_hash)
+                    fields["blocknumber"] = individual.generator.get_random_blocknumber(function_hash)
             else:
-                gene["blocknumber"] = individual.generator.get_random_blocknumber(function_hash)
+                fields["blocknumber"] = individual.generator.get_random_blocknumber(function_hash)
 
             # GLOBAL STATE
             if "balance" in gene:
                 if random.random() <= self.pm:
-                    gene["balance"] = individual.generator.get_random_balance(function_hash)
+                    fields["balance"] = individual.generator.get_random_balance(function_hash)
             else:
-                gene["balance"] = individual.generator.get_random_balance(function_hash)
+                fields["balance"] = individual.generator.get_random_balance(function_hash)
 
             if "call_return" in gene:
                 for address in gene["call_return"]:
                     if random.random() <= self.pm:
-                        gene["call_return"][address] = individual.generator.get_random_callresult(function_hash, address)
+                        fields.setdefault("call_return", dict(gene["call_return"]))[address] = individual.generator.get_random_callresult(function_hash, address)
             else:
-                gene["call_return"] = dict()
+                fields["call_return"] = dict()
                 address, call_return_value = individual.generator.get_random_callresult_and_address(function_hash)
-                if address and address not in gene["call_return"]:
-                    gene["call_return"][address] = call_return_value
+                if address and address not in fields["call_return"]:
+                    fields["call_return"][address] = call_return_value
 
             if "extcodesize" in gene:
                 for address in gene["extcodesize"]:
                     if random.random() <= self.pm:
-                        gene["extcodesize"][address] = individual.generator.get_random_extcodesize(function_hash, address)
+                        fields.setdefault("extcodesize", dict(gene["extcodesize"]))[address] = individual.generator.get_random_extcodesize(function_hash, address)
             else:
-                gene["extcodesize"] = dict()
+                fields["extcodesize"] = dict()
                 address, extcodesize_value = individual.generator.get_random_extcodesize_and_address(function_hash)
-                if address and address not in gene["extcodesize"]:
-                    gene["extcodesize"][address] = extcodesize_value
+                if address and address not in fields["extcodesize"]:
+                    fields["extcodesize"][address] = extcodesize_value
 
             if "returndatasize" in gene:
                 for address in gene["returndatasize"]:
                     if random.random() <= self.pm:
-                        gene["returndatasize"][address] = individual.generator.get_random_returndatasize(function_hash, address)
+                        fields.setdefault("returndatasize", dict(gene["returndatasize"]))[address] = individual.generator.get_random_returndatasize(function_hash, address)
             else:
-                gene["returndatasize"] = dict()
+                fields["returndatasize"] = dict()
                 address, returndatasize_value = individual.generator.get_random_returndatasize_and_address(function_hash)
-                if address and address not in gene["returndatasize"]:
-                    gene["returndatasize"][address] = returndatasize_value
+                if address and address not in fields["returndatasize"]:
+                    fields["returndatasize"][address] = returndatasize_value
+
+            if fields:
+                individual.replace_gene(gene_index, **fields)
 
-        individual.solution = individual.decode()
         return individual
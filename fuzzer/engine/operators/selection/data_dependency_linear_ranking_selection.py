@@ -1,75 +1,112 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from random import random, shuffle, choice
-from itertools import accumulate
-from bisect import bisect_right
+from random import choice
 
-from ...plugin_interfaces.operators.selection import Selection
+from .linear_ranking_selection import LinearRankingSelection
 
-class DataDependencyLinearRankingSelection(Selection):
+class DataDependencyLinearRankingSelection(LinearRankingSelection):
     def __init__(self, env, pmin=0.1, pmax=0.9):
-        self.env = env
         '''
-        Selection operator using Linear Ranking selection method.
+        Selection operator using Linear Ranking selection method, which
+        prefers mothers that read storage written by the father or vice versa.
 
         Reference: Baker J E. Adaptive selection methods for genetic
         algorithms[C]//Proceedings of an International Conference on Genetic
         Algorithms and their applications. 1985: 101-111.
         '''
-        # Selection probabilities for the worst and best individuals.
-        self.pmin, self.pmax = pmin, pmax
+        super().__init__(pmin, pmax)
+        self.env = env
+
+        # Bit assigned to each storage slot and read/write bitsets per function.
+        self.slot_bits = {}
+        self.function_bitsets = {}
+        self.function_bitsets_version = None
+
+        # Ranks of the individuals reading/writing a storage slot (bit).
+        self.readers = {}
+        self.writers = {}
+        self.functions = []
 
     def select(self, population, fitness):
         '''
         Select a pair of parent individuals using linear ranking method.
         '''
-
-        # Add rank to all individuals in population.
-        all_fits = population.all_fits(fitness)
-        indvs = population.individuals
-        sorted_indvs = sorted(indvs, key=lambda indv: all_fits[indvs.index(indv)])
-
-        # Individual number.
-        NP = len(sorted_indvs)
-
-        # Assign selection probabilities linearly.
-        # NOTE: Here the rank i belongs to {1, ..., N}
-        p = lambda i: (self.pmin + (self.pmax - self.pmin)*(i-1)/(NP-1))
-        probabilities = [self.pmin] + [p(i) for i in range(2, NP)] + [self.pmax]
-
-        # Normalize probabilities.
-        psum = sum(probabilities)
-        wheel = list(accumulate([p/psum for p in probabilities]))
-
         # Select parents.
-        father_idx = bisect_right(wheel, random())
-        father = sorted_indvs[father_idx]
-
-        father_reads, father_writes = DataDependencyLinearRankingSelection.extract_reads_and_writes(father, self.env)
-        f_a = [i["arguments"][0] for i in father.chromosome]
-
-        shuffle(indvs)
-        for ind in indvs:
-            i_a = [i["arguments"][0] for i in ind.chromosome]
-            if f_a != i_a:
-                i_reads, i_writes = DataDependencyLinearRankingSelection.extract_reads_and_writes(ind, self.env)
-                if not i_reads.isdisjoint(father_writes) or not father_reads.isdisjoint(i_writes):
-                    return father, ind
-
-        mother_idx = (father_idx + 1) % len(wheel)
-        mother = sorted_indvs[mother_idx]
+        father_idx = self.sample(population, fitness)
+        father = self.sorted_indvs[father_idx]
+
+        # Look up the individuals that are data dependent on the father.
+        father_reads, father_writes = self.extract_reads_and_writes(father)
+        candidates = set()
+        for bit in DataDependencyLinearRankingSelection.bits(father_writes):
+            candidates.update(self.readers.get(bit, ()))
+        for bit in DataDependencyLinearRankingSelection.bits(father_reads):
+            candidates.update(self.writers.get(bit, ()))
+        candidates = [i for i in sorted(candidates) if self.functions[i] != self.functions[father_idx]]
+        if candidates:
+            return father, self.sorted_indvs[choice(candidates)]
+
+        mother_idx = (father_idx + 1) % len(self.wheel)
+        mother = self.sorted_indvs[mother_idx]
 
         return father, mother
 
-    @staticmethod
-    def extract_reads_and_writes(individual, env):
-        reads, writes = set(), set()
+    def rank(self, population, fitness):
+        '''
+        Rank the population and index its individuals by the storage slots
+        they read and write.
+        '''
+        super().rank(population, fitness)
+
+        self.readers, self.writers = {}, {}
+        self.functions = []
+        for i, indv in enumerate(self.sorted_indvs):
+            self.functions.append(tuple(gene["arguments"][0] for gene in indv.chromosome))
+            reads, writes = self.extract_reads_and_writes(indv)
+            for bit in DataDependencyLinearRankingSelection.bits(reads):
+                self.readers.setdefault(bit, set()).add(i)
+            for bit in DataDependencyLinearRankingSelection.bits(writes):
+                self.writers.setdefault(bit, set()).add(i)
+
+    def extract_reads_and_writes(self, individual):
+        '''
+        Get the storage slots read and written by an individual as bitsets,
+        cached on the individual until the data dependencies change.
+        '''
+        version = self.env.coverage_version
+        if individual.data_dependency_bitsets and individual.data_dependency_bitsets[0] == version:
+            return individual.data_dependency_bitsets[1:]
 
+        if self.function_bitsets_version != version:
+            self.function_bitsets.clear()
+            self.function_bitsets_version = version
+
+        reads, writes = 0, 0
         for t in individual.chromosome:
             _function_hash = t["arguments"][0]
-            if _function_hash in env.data_dependencies:
-                reads.update(env.data_dependencies[_function_hash]["read"])
-                writes.update(env.data_dependencies[_function_hash]["write"])
-
+            if _function_hash not in self.function_bitsets:
+                self.function_bitsets[_function_hash] = (0, 0)
+                if _function_hash in self.env.data_dependencies:
+                    self.function_bitsets[_function_hash] = (self.to_bitset(self.env.data_dependencies[_function_hash]["read"]),
+                                                             self.to_bitset(self.env.data_dependencies[_function_hash]["write"]))
+            reads |= self.function_bitsets[_function_hash][0]
+            writes |= self.function_bitsets[_function_hash][1]
+
+        individual.data_dependency_bitsets = (version, reads, writes)
         return reads, writes
+
+    def to_bitset(self, storage_slots):
+        bitset = 0
+        for storage_slot in storage_slots:
+            if storage_slot not in self.slot_bits:
+                self.slot_bits[storage_slot] = len(self.slot_bits)
+            bitset |= 1 << self.slot_bits[storage_slot]
+        return bitset
+
+    @staticmethod
+    def bits(bitset):
+        while bitset:
+            lowest = bitset & -bitset
+            yield lowest.bit_length() - 1
+            bitset ^= lowest
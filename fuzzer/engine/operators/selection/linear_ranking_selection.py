@@ -1,9 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from random import random, shuffle, choice
+from random import choices
 from itertools import accumulate
-from bisect import bisect_right
 
 from ...plugin_interfaces.operators.selection import Selection
 
@@ -19,18 +18,48 @@ class LinearRankingSelection(Selection):
         # Selection probabilities for the worst and best individuals.
         self.pmin, self.pmax = pmin, pmax
 
+        # Ranking, probability wheel and sampled fathers of the current generation.
+        self.sorted_indvs = []
+        self.wheel = []
+        self.fathers = []
+
     def select(self, population, fitness):
         '''
         Select a pair of parent individuals using linear ranking method.
         '''
+        # Select parents.
+        father_idx = self.sample(population, fitness)
+        father = self.sorted_indvs[father_idx]
+        mother_idx = (father_idx + 1) % len(self.wheel)
+        mother = self.sorted_indvs[mother_idx]
+
+        return father, mother
+
+    def sample(self, population, fitness):
+        '''
+        Get the rank of the next father from the probability wheel.
+        '''
+        # Rank the population only once per generation.
+        if population.updated or not self.wheel:
+            self.rank(population, fitness)
 
+        # Sample the fathers of all parent pairs at once.
+        if not self.fathers:
+            self.fathers = choices(range(len(self.wheel)), cum_weights=self.wheel, k=max(1, len(self.wheel) // 2))
+
+        return self.fathers.pop()
+
+    def rank(self, population, fitness):
+        '''
+        Sort the population by fitness and build the probability wheel.
+        '''
         # Add rank to all individuals in population.
         all_fits = population.all_fits(fitness)
         indvs = population.individuals
-        sorted_indvs = sorted(indvs, key=lambda indv: all_fits[indvs.index(indv)])
+        self.sorted_indvs = [indvs[i] for i in sorted(range(len(indvs)), key=all_fits.__getitem__)]
 
         # Individual number.
-        NP = len(population)
+        NP = len(self.sorted_indvs)
 
         # Assign selection probabilities linearly.
         # NOTE: Here the rank i belongs to {1, ..., N}
@@ -39,12 +68,7 @@ class LinearRankingSelection(Selection):
 
         # Normalize probabilities.
         psum = sum(probabilities)
-        wheel = list(accumulate([p/psum for p in probabilities]))
+        self.wheel = list(accumulate([p/psum for p in probabilities]))
+        self.fathers = []
 
-        # Select parents.
-        father_idx = bisect_right(wheel, random())
-        father = sorted_indvs[father_idx]
-        mother_idx = (father_idx + 1) % len(wheel)
-        mother = sorted_indvs[mother_idx]
-
-        return father, mother
+        population.clear_flag()
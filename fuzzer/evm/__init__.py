@@ -65,6 +65,7 @@ class InstrumentedEVM:
         self.logger = initialize_logger("EVM")
         self.accounts = list()
         self.snapshot = None
+        self.snapshot_version = 0
         self.vm = None
 
     def get_block_by_blockid(self, block_identifier):
@@ -154,50 +155,34 @@ class InstrumentedEVM:
         self.storage_emulator.set_balance(address, 1)
         return result
 
-    def deploy_transaction(self, input, gas_price=settings.GAS_PRICE, debug=False):
-        transaction = input["transaction"]
-        from_account = decode_hex(transaction["from"])
+    def deploy_transaction(self, transaction, gas_price=settings.GAS_PRICE, debug=False):
+        from_account = decode_hex(transaction.sender)
         nonce = self.vm.state.get_nonce(from_account)
         try:
-            to = decode_hex(transaction["to"])
+            to = decode_hex(transaction.to)
         except:
-            to = transaction["to"]
+            to = transaction.to
         tx = self.vm.create_unsigned_transaction(
             nonce=nonce,
             gas_price=gas_price,
-            gas=transaction["gaslimit"],
+            gas=transaction.gaslimit,
             to=to,
-            value=transaction["value"],
-            data=decode_hex(transaction["data"]),
+            value=transaction.value,
+            data=decode_hex(transaction.data),
         )
         tx = SpoofTransaction(tx, from_=from_account)
 
-        block = input["block"]
-        if "timestamp" in block and block["timestamp"] is not None:
-            self.vm.state.fuzzed_timestamp = block["timestamp"]
-        else:
-            self.vm.state.fuzzed_timestamp = None
-        if "blocknumber" in block and block["blocknumber"] is not None:
-            self.vm.state.fuzzed_blocknumber = block["blocknumber"]
-        else:
-            self.vm.state.fuzzed_blocknumber = None
-
-        global_state = input["global_state"]
-        if "balance" in global_state and global_state["balance"] is not None:
-            self.vm.state.fuzzed_balance = global_state["balance"]
-        else:
-            self.vm.state.fuzzed_balance = None
+        self.vm.state.fuzzed_timestamp = transaction.timestamp
+        self.vm.state.fuzzed_blocknumber = transaction.blocknumber
+        self.vm.state.fuzzed_balance = transaction.balance
 
-        if "call_return" in global_state and global_state["call_return"] is not None \
-                and len(global_state["call_return"]) > 0:
-            self.vm.state.fuzzed_call_return = global_state["call_return"]
-        if "extcodesize" in global_state and global_state["extcodesize"] is not None \
-                and len(global_state["extcodesize"]) > 0:
-            self.vm.state.fuzzed_extcodesize = global_state["extcodesize"]
+        if transaction.call_return:
+            self.vm.state.fuzzed_call_return = transaction.call_return
+        if transaction.extcodesize:
+            self.vm.state.fuzzed_extcodesize = transaction.extcodesize
 
-        environment = input["environment"]
-        if "returndatasize" in environment and environment["returndatasize"] is not None:
-            self.vm.state.fuzzed_returndatasize = environment["returndatasize"]
+        if transaction.returndatasize is not None:
+            self.vm.state.fuzzed_returndatasize = transaction.returndatasize
 
         self.storage_emulator.set_balance(from_account, settings.ACCOUNT_BALANCE)
         return self.execute(tx, debug=debug)
@@ -213,6 +198,7 @@ class InstrumentedEVM:
 
     def create_snapshot(self):
         self.snapshot = self.storage_emulator.record()
+        self.snapshot_version += 1
         self.storage_emulator.set_snapshot(self.snapshot)
 
     def restore_from_snapshot(self):
@@ -335,6 +335,8 @@ def fuzz_apply_computation(cls, state, message, transaction_context):
 
         opcode_lookup = computation.opcodes
         computation.trace = list()
+        # Hit counts of the (jump pc, destination pc) edges
+        computation.edges = dict()
         previous_stack = []
         previous_call_address = None
         memory = None
@@ -373,6 +375,10 @@ def fuzz_apply_computation(cls, state, message, transaction_context):
                     computation.stack_push_int(size)
                     computation.stack_push_int(start_position)
                     opcode_fn(computation=computation)
+                elif opcode == 0x56 or opcode == 0x57: # JUMP, JUMPI
+                    opcode_fn(computation=computation)
+                    edge = (previous_pc - 1) << 32 | computation.code.pc
+                    computation.edges[edge] = computation.edges.get(edge, 0) + 1
                 else:
                     opcode_fn(computation=computation)
             except Halt:
@@ -16,10 +16,13 @@ from z3 import Solver
 from evm import InstrumentedEVM
 from detectors import DetectorExecutor
 from engine import EvolutionaryFuzzingEngine
-from engine.components import Generator, Individual, Population
+from engine.components import Generator, Individual, Population, Transaction, Corpus
 from engine.analysis import SymbolicTaintAnalyzer
 from engine.analysis import ExecutionTraceAnalyzer
-from engine.environment import FuzzingEnvironment
+from engine.analysis import Checkpoint
+from engine.analysis import MetricsReporter
+from engine.analysis import Timeline
+from engine.environment import FuzzingEnvironment, InstructionCoverage, BranchTable
 from engine.operators import LinearRankingSelection
 from engine.operators import DataDependencyLinearRankingSelection
 from engine.operators import Crossover
@@ -29,6 +32,7 @@ from engine.fitness import fitness_function
 
 from utils import settings
 from utils.source_map import SourceMap
+from utils.results import ResultsLog
 from utils.utils import initialize_logger, compile, get_interface_from_abi, get_pcs_and_jumpis, get_function_signature_mapping
 from utils.control_flow_graph import ControlFlowGraph
 
@@ -56,6 +60,19 @@ class Fuzzer:
         # Initialize results
         self.results = {"errors": {}}
 
+        # Resolve the targets of directed fuzzing
+        target_pcs = None
+        if args.target:
+            try:
+                target_pcs = cfg.get_target_pcs(args.target, settings.EVM_VERSION, source_map)
+            except ValueError as e:
+                logger.error("Invalid target: %s", e)
+                sys.exit(-1)
+            if not target_pcs:
+                logger.warning("None of the targets %s was found in %s, fuzzing undirected.", " ".join(args.target), contract_name)
+            else:
+                logger.info("Fuzzing towards %d target pc(s)", len(target_pcs))
+
         # Initialize fuzzing environment
         self.env = FuzzingEnvironment(instrumented_evm=self.instrumented_evm,
                                       contract_name=self.contract_name,
@@ -66,6 +83,14 @@ class Fuzzer:
                                       interface=self.interface,
                                       overall_pcs=self.overall_pcs,
                                       overall_jumpis=self.overall_jumpis,
+                                      code_coverage=InstructionCoverage(self.overall_pcs[-1] + 1),
+                                      branch_coverage=BranchTable(self.overall_jumpis),
+                                      corpus=Corpus(directory=args.corpus) if settings.CORPUS_SIZE > 0 else None,
+                                      checkpoint=Checkpoint(args.checkpoint) if args.checkpoint else None,
+                                      metrics_reporter=MetricsReporter(args.metrics, args.metrics_port, {"contract": self.contract_name}) if args.metrics or args.metrics_port else None,
+                                      target_pcs=target_pcs if target_pcs else None,
+                                      target_distances=cfg.compute_distances(target_pcs) if target_pcs else dict(),
+                                      timeline=Timeline(args.timeline, self.contract_name, seed) if args.timeline else None,
                                       len_overall_pcs_with_children=0,
                                       other_contracts = list(),
                                       args=args,
@@ -96,16 +121,8 @@ class Fuzzer:
                         cc, _ = get_pcs_and_jumpis(self.instrumented_evm.get_code(to_canonical_address(contract_address)).hex())
                         self.env.len_overall_pcs_with_children += len(cc)
                 else:
-                    input = {}
-                    input["block"] = {}
-                    input["transaction"] = {
-                        "from": transaction["from"],
-                        "to": transaction["to"],
-                        "gaslimit": int(transaction["gas"]),
-                        "value": int(transaction["value"]),
-                        "data": transaction["input"]
-                    }
-                    input["global_state"] = {}
+                    input = Transaction(transaction["from"], transaction["to"], int(transaction["value"]),
+                                        int(transaction["gas"]), transaction["input"])
                     out = self.instrumented_evm.deploy_transaction(input, int(transaction["gasPrice"]))
 
             if "constructor" in self.interface:
@@ -127,6 +144,8 @@ class Fuzzer:
                 self.instrumented_evm.accounts.remove(contract_address)
 
             self.env.overall_pcs, self.env.overall_jumpis = get_pcs_and_jumpis(self.instrumented_evm.get_code(to_canonical_address(contract_address)).hex())
+            self.env.code_coverage = InstructionCoverage(self.env.overall_pcs[-1] + 1)
+            self.env.branch_coverage = BranchTable(self.env.overall_jumpis)
 
         if self.args.abi:
             contract_address = self.args.contract
@@ -136,13 +155,18 @@ class Fuzzer:
         generator = Generator(interface=self.interface,
                               bytecode=self.deployement_bytecode,
                               accounts=self.instrumented_evm.accounts,
-                              contract=contract_address)
+                              contract=contract_address,
+                              metrics=self.env.metrics)
 
         # Create initial population
         size = 2 * len(self.interface)
         population = Population(indv_template=Individual(generator=generator),
                                 indv_generator=generator,
-                                size=settings.POPULATION_SIZE if settings.POPULATION_SIZE else size).init()
+                                size=settings.POPULATION_SIZE if settings.POPULATION_SIZE else size)
+        if self.env.corpus and self.env.corpus.directory:
+            # Warm-start from the individuals of a previous campaign, the rest is random
+            population.individuals.extend(self.env.corpus.load(generator)[:population.size])
+        population.init()
 
         # Create genetic operators
         if self.args.data_dependency:
@@ -155,13 +179,17 @@ class Fuzzer:
             mutation = Mutation(pm=settings.PROBABILITY_MUTATION)
 
         # Create and run our evolutionary fuzzing engine
-        engine = EvolutionaryFuzzingEngine(population=population, selection=selection, crossover=crossover, mutation=mutation, mapping=get_function_signature_mapping(self.env.abi))
+        engine = EvolutionaryFuzzingEngine(population=population, selection=selection, crossover=crossover, mutation=mutation, mapping=get_function_signature_mapping(self.env.abi), metrics=self.env.metrics)
         engine.fitness_register(lambda x: fitness_function(x, self.env))
-        engine.analysis.append(ExecutionTraceAnalyzer(self.env))
+        analyzer = ExecutionTraceAnalyzer(self.env)
+        engine.analysis.append(analyzer)
 
         self.env.execution_begin = time.time()
         self.env.population = population
 
+        if self.args.resume:
+            self.env.checkpoint.resume(self.env, generator, population, engine, analyzer)
+
         engine.run(ng=settings.GENERATIONS)
 
         if self.env.args.cfg:
@@ -179,7 +207,9 @@ def main():
     logger = initialize_logger("Main    ")
 
     # Check if contract has already been analyzed
-    if args.results and os.path.exists(args.results):
+    # A .jsonl results file is shared by many runs, it is checked per contract once the source is compiled
+    results_log = ResultsLog(args.results) if args.results and args.results.lower().endswith(".jsonl") else None
+    if not results_log and args.results and os.path.exists(args.results):
         os.remove(args.results)
         logger.info("Contract "+str(args.source)+" has already been analyzed: "+str(args.results))
         sys.exit(0)
@@ -226,6 +256,9 @@ def main():
             for contract_name, contract in compiler_output['contracts'][args.source].items():
                 if args.contract and contract_name != args.contract:
                     continue
+                if results_log and results_log.analyzed(args.source, contract_name):
+                    logger.info("Contract "+str(args.source)+":"+contract_name+" has already been analyzed: "+str(args.results))
+                    continue
                 if contract['abi'] and contract['evm']['bytecode']['object'] and contract['evm']['deployedBytecode']['object']:
                     source_map = SourceMap(':'.join([args.source, contract_name]), compiler_output)
                     Fuzzer(contract_name, contract["abi"], contract['evm']['bytecode']['object'], contract['evm']['deployedBytecode']['object'], instrumented_evm, blockchain_state, solver, args, seed, source_map).run()
@@ -283,7 +316,14 @@ def launch_argument_parser():
                         dest="probability_mutation", type=float)
 
     # Miscellaneous parameters
-    parser.add_argument("-r", "--results", type=str, help="Folder or JSON file where results should be stored.")
+    parser.add_argument("-r", "--results", type=str, help="Folder, JSON or JSON lines (.jsonl) file where results should be stored.")
+    parser.add_argument("--corpus", type=str, help="Folder where the corpus is saved, and loaded from to warm-start the fuzzer.")
+    parser.add_argument("--checkpoint", type=str, help="Folder where the fuzzing session is periodically checkpointed.")
+    parser.add_argument("--resume", help="Resume the fuzzing session from the last checkpoint.", action="store_true")
+    parser.add_argument("--metrics", type=str, help="JSON lines file where metrics are appended after every generation.")
+    parser.add_argument("--metrics-port", help="Local port serving the metrics of the last generation in Prometheus format.", action="store", dest="metrics_port", type=int)
+    parser.add_argument("--timeline", type=str, help="CSV file where coverage and findings are appended at fixed intervals of time.")
+    parser.add_argument("--target", type=str, nargs="+", help="Fuzz towards pcs (e.g. 0x1a2), instructions (e.g. SELFDESTRUCT) or source lines (e.g. line:42).")
     parser.add_argument("--seed", type=float, help="Initialize the random number generator with a given seed.")
     parser.add_argument("--cfg", help="Build control-flow graph and highlight code coverage.", action="store_true")
     parser.add_argument("--rpc-host", help="Ethereum client RPC hostname.", action="store", dest="rpc_host", type=str)
@@ -292,15 +332,24 @@ def launch_argument_parser():
     parser.add_argument("--data-dependency",
                         help="Disable/Enable data dependency analysis: 0 - Disable, 1 - Enable (default: 1)", action="store",
                         dest="data_dependency", type=int)
+    parser.add_argument("--edge-coverage",
+                        help="Disable/Enable edge coverage with hit-count buckets as fitness: 0 - Disable, 1 - Enable (default: 0)", action="store",
+                        dest="edge_coverage", type=int)
     parser.add_argument("--constraint-solving",
                         help="Disable/Enable constraint solving: 0 - Disable, 1 - Enable (default: 1)", action="store",
                         dest="constraint_solving", type=int)
     parser.add_argument("--environmental-instrumentation",
                         help="Disable/Enable environmental instrumentation: 0 - Disable, 1 - Enable (default: 1)", action="store",
                         dest="environmental_instrumentation", type=int)
+    parser.add_argument("--exploit-minimization",
+                        help="Disable/Enable minimization of the transaction sequences of detected errors: 0 - Disable, 1 - Enable (default: 0)", action="store",
+                        dest="exploit_minimization", type=int)
     parser.add_argument("--max-individual-length",
                         help="Maximal length of an individual (default: " + str(settings.MAX_INDIVIDUAL_LENGTH) + ")", action="store",
                         dest="max_individual_length", type=int)
+    parser.add_argument("--max-ring-buffer-length",
+                        help="Maximal number of values kept per generator pool (default: " + str(settings.MAX_RING_BUFFER_LENGTH) + ")", action="store",
+                        dest="max_ring_buffer_length", type=int)
     parser.add_argument("--max-symbolic-execution",
                         help="Maximum number of symbolic execution calls before restting population (default: " + str(settings.MAX_SYMBOLIC_EXECUTION) + ")", action="store",
                         dest="max_symbolic_execution", type=int)
@@ -326,6 +375,8 @@ def launch_argument_parser():
         parser.error("--abi requires --contract to be an address, not a name.")
     if args.abi and args.blockchain_state and not args.blockchain_state.isnumeric():
         parser.error("--abi requires --blockchain-state to be a number, not a file.")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume requires --checkpoint.")
 
     if args.evm_version:
         settings.EVM_VERSION = args.evm_version
@@ -344,18 +395,29 @@ def launch_argument_parser():
 
     if args.data_dependency == None:
         args.data_dependency = 1
+    if args.edge_coverage == None:
+        args.edge_coverage = 0
     if args.constraint_solving == None:
         args.constraint_solving = 1
     if args.environmental_instrumentation == None:
         args.environmental_instrumentation = 1
+    if args.exploit_minimization == None:
+        args.exploit_minimization = 0
 
     if args.environmental_instrumentation == 1:
         settings.ENVIRONMENTAL_INSTRUMENTATION = True
     elif args.environmental_instrumentation == 0:
         settings.ENVIRONMENTAL_INSTRUMENTATION = False
 
+    if args.exploit_minimization == 1:
+        settings.EXPLOIT_MINIMIZATION = True
+    elif args.exploit_minimization == 0:
+        settings.EXPLOIT_MINIMIZATION = False
+
     if args.max_individual_length:
         settings.MAX_INDIVIDUAL_LENGTH = args.max_individual_length
+    if args.max_ring_buffer_length:
+        settings.MAX_RING_BUFFER_LENGTH = args.max_ring_buffer_length
     if args.max_symbolic_execution:
         settings.MAX_SYMBOLIC_EXECUTION = args.max_symbolic_execution
 
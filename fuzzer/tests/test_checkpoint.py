@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import types
+import shutil
+import tempfile
+import unittest
+
+from z3 import BitVec, Not, ULT, eq
+from eth_utils import to_canonical_address
+
+from evm import InstrumentedEVM
+from engine.analysis import Checkpoint
+from engine.components import Generator, Individual
+from engine.environment import FuzzingEnvironment
+from utils import settings
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def session(self):
+        evm = InstrumentedEVM()
+        evm.set_vm_by_name(settings.EVM_VERSION)
+        evm.create_fake_accounts()
+        evm.create_snapshot()
+        generator = Generator(interface={"0xa9059cbb": ["address", "uint256"]}, bytecode="", accounts=evm.accounts, contract="0x" + "11" * 20)
+        env = FuzzingEnvironment(instrumented_evm=evm, results={"errors": {}}, overall_pcs=[0], overall_jumpis=[],
+                                 len_overall_pcs_with_children=0, other_contracts=[], corpus=None, execution_begin=0)
+        population = types.SimpleNamespace(individuals=[Individual(generator=generator).init() for _ in range(2)])
+        engine = types.SimpleNamespace(current_generation=0, elapsed_time=0)
+        analyzer = types.SimpleNamespace(symbolic_execution_count=0, phase_times=dict())
+        return env, generator, population, engine, analyzer
+
+    def test_resume_restores_path_conditions_and_evm_state(self):
+        env, generator, population, engine, analyzer = self.session()
+        account = to_canonical_address(env.instrumented_evm.accounts[0])
+        env.instrumented_evm.storage_emulator.set_balance(account, 12345)
+        env.instrumented_evm.create_snapshot()
+        value = BitVec("calldataload_0_4", 256)
+        expressions = [ULT(value, 10), Not(value == 3)]
+        env.visited_branches = {42: {1: {"indv_hash": "0x", "chromosome": [], "transaction_index": 0, "expression": expressions}},
+                                50: {0: {"indv_hash": "0x", "chromosome": [], "transaction_index": 0, "expression": None}}}
+        engine.current_generation = 3
+
+        checkpoint = Checkpoint(self.directory, interval=0)
+        checkpoint.save(env, generator, population, engine, analyzer)
+        checkpoint.join()
+
+        env, generator, population, engine, analyzer = self.session()
+        self.assertTrue(Checkpoint(self.directory).resume(env, generator, population, engine, analyzer))
+        self.assertEqual(engine.current_generation, 3)
+        self.assertEqual(env.instrumented_evm.get_balance(account), 12345)
+        self.assertIsNone(env.visited_branches[50][0]["expression"])
+        restored = env.visited_branches[42][1]["expression"]
+        self.assertEqual(len(restored), len(expressions))
+        for expression, original in zip(restored, expressions):
+            self.assertTrue(eq(expression, original))
+
+if __name__ == '__main__':
+    unittest.main()
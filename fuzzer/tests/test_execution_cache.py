@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import random
+import logging
+import unittest
+
+from types import SimpleNamespace
+
+from eth_utils import encode_hex
+
+from evm import InstrumentedEVM
+from detectors import DetectorExecutor
+from engine.analysis import SymbolicTaintAnalyzer, ExecutionTraceAnalyzer
+from engine.components import Generator, Individual, Corpus
+from engine.environment import FuzzingEnvironment
+from engine.fitness import fitness_function
+from utils import settings
+from utils.control_flow_graph import ControlFlowGraph
+
+# Creation code of examples/TokenSale, which does not need solc
+TRANSACTIONS = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "TokenSale", "transactions.json")
+INTERFACE = {"0xa6f2ae3a": [], "0x3ccfd60b": []}
+
+class ExecutionCacheTest(unittest.TestCase):
+    def setUp(self):
+        with open(TRANSACTIONS) as file:
+            bytecode = json.loads(file.readline())["input"]
+        evm = InstrumentedEVM()
+        evm.set_vm_by_name(settings.EVM_VERSION)
+        evm.create_fake_accounts()
+        result = evm.deploy_contract(evm.accounts[0], bytecode)
+        evm.create_snapshot()
+        cfg = ControlFlowGraph()
+        cfg.build(encode_hex(evm.get_code(result.msg.storage_address)), settings.EVM_VERSION)
+        args = SimpleNamespace(results=None, edge_coverage=1, data_dependency=0)
+        self.env = FuzzingEnvironment(instrumented_evm=evm, results={"errors": {}}, symbolic_taint_analyzer=SymbolicTaintAnalyzer(),
+                                      detector_executor=DetectorExecutor(), overall_pcs=[], overall_jumpis=[], other_contracts=[],
+                                      corpus=Corpus(), args=args, cfg=cfg)
+        self.env.detector_executor.logger.setLevel(logging.CRITICAL)
+        self.analyzer = ExecutionTraceAnalyzer(self.env)
+        random.seed(1)
+        generator = Generator(interface=INTERFACE, bytecode=bytecode, accounts=evm.accounts, contract=encode_hex(result.msg.storage_address))
+        self.individual = Individual(generator=generator).init()
+
+    def execute(self):
+        self.env.individual_edges.clear()
+        if self.individual.hash in self.analyzer.execution_cache:
+            self.analyzer.replay_execution(self.individual, self.env)
+        else:
+            self.analyzer.execution_function(self.individual, self.env)
+        return fitness_function(self.individual, self.env)
+
+    def test_replay_earns_no_edge_credit(self):
+        first = self.execute()
+        credit = self.env.individual_edges[self.individual.hash]
+        self.assertGreater(credit, 0)
+        replayed = self.execute()
+        self.assertEqual(self.env.individual_edges[self.individual.hash], 0)
+        self.assertEqual(replayed, first - credit)
+        # The same fitness as executing the individual again
+        self.analyzer.execution_cache.clear()
+        self.assertEqual(self.execute(), replayed)
+
+    def test_replay_is_recorded_in_the_corpus(self):
+        self.execute()
+        hits, cost = dict(self.env.corpus.branch_hits), self.env.corpus.total_cost
+        self.env.unique_individuals.clear()
+        self.execute()
+        self.assertEqual(self.env.corpus.executions, 2)
+        self.assertEqual(self.env.corpus.total_cost, 2 * cost)
+        self.assertEqual(self.env.corpus.branch_hits, {branch: 2 * count for branch, count in hits.items()})
+        self.assertEqual(self.env.unique_individuals, {self.individual.hash})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import unittest
+
+from types import SimpleNamespace
+
+from engine.analysis.exploit_minimization import ExploitMinimizer
+from utils import settings
+
+class DdminTest(unittest.TestCase):
+    def test_single_culprit(self):
+        self.assertEqual(ExploitMinimizer.ddmin(list(range(8)), lambda c: 5 in c), [5])
+
+    def test_ordered_pair_is_kept(self):
+        def reproduces(chromosome):
+            return 2 in chromosome and 6 in chromosome and chromosome.index(2) < chromosome.index(6)
+        self.assertEqual(ExploitMinimizer.ddmin(list(range(10)), reproduces), [2, 6])
+
+    def test_result_is_one_minimal(self):
+        culprits = {1, 4, 7}
+        result = ExploitMinimizer.ddmin(list(range(9)), lambda c: culprits <= set(c))
+        self.assertEqual(result, [1, 4, 7])
+
+    def test_every_gene_needed(self):
+        chromosome = list(range(5))
+        self.assertEqual(ExploitMinimizer.ddmin(chromosome, lambda c: len(c) == 5), chromosome)
+
+    def test_short_chromosome_is_unchanged(self):
+        self.assertEqual(ExploitMinimizer.ddmin([3], lambda c: True), [3])
+        self.assertEqual(ExploitMinimizer.ddmin([], lambda c: True), [])
+
+class ExploitMinimizerTest(unittest.TestCase):
+    def setUp(self):
+        self.global_timeout = settings.GLOBAL_TIMEOUT
+        env = SimpleNamespace(execution_begin=time.time(), checkpoint=None, results={"errors": {}})
+        self.minimizer = ExploitMinimizer(SimpleNamespace(env=env))
+        # A busy worker, so that submitted errors stay in the queue
+        self.terminated = []
+        process = SimpleNamespace(terminate=lambda: self.terminated.append(True))
+        connection = SimpleNamespace(poll=lambda timeout=0: False, close=lambda: None)
+        self.minimizer.worker = (process, connection, 1, "Integer Overflow")
+
+    def tearDown(self):
+        settings.GLOBAL_TIMEOUT = self.global_timeout
+
+    def test_queue_is_bounded(self):
+        individual = SimpleNamespace(chromosome=[{}, {}], generator=None)
+        with self.assertLogs("Minimizer", "WARNING") as logs:
+            for pc in range(settings.MINIMIZATION_QUEUE_SIZE + 1):
+                self.minimizer.submit(individual, pc, "Reentrancy")
+        self.assertEqual(len(self.minimizer.pending), settings.MINIMIZATION_QUEUE_SIZE)
+        self.assertEqual(len(logs.output), 1)
+
+    def test_join_is_bounded_by_the_global_timeout(self):
+        settings.GLOBAL_TIMEOUT = 10
+        self.minimizer.env.execution_begin = time.time() - settings.GLOBAL_TIMEOUT
+        self.minimizer.pending.append(([{}, {}], None, 2, "Reentrancy"))
+        start = time.time()
+        with self.assertLogs("Minimizer", "WARNING") as logs:
+            self.minimizer.join(timeout=30)
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(self.terminated, [True])
+        self.assertIsNone(self.minimizer.worker)
+        self.assertFalse(self.minimizer.pending)
+        self.assertEqual(len(logs.output), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import unittest
+
+from benchmarks.hot_path_benchmark import HOT_PATHS, measure, record_bytecode
+
+# Creation code of examples/TokenSale, which does not need solc
+TRANSACTIONS = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "TokenSale", "transactions.json")
+INTERFACE = {"0xa6f2ae3a": [], "0x3ccfd60b": []}
+
+class HotPathBenchmarkTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(TRANSACTIONS) as file:
+            bytecode = json.loads(file.readline())["input"]
+        cls.recording = record_bytecode("TokenSale", INTERFACE, bytecode, 3, 1)
+
+    def test_every_hot_path_runs(self):
+        self.assertGreater(self.recording.instructions, 0)
+        for hot_path, (prepare, run) in HOT_PATHS.items():
+            with self.subTest(hot_path=hot_path):
+                ns, peak, retained = measure(self.recording, prepare, run, 1)
+                self.assertGreater(ns, 0)
+
+if __name__ == '__main__':
+    unittest.main()
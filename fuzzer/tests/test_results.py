@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.results import ResultsLog
+
+class ResultsLogTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.log = ResultsLog(os.path.join(self.directory, "results.jsonl"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_analyzed_per_contract_of_a_source(self):
+        self.assertFalse(self.log.analyzed("Token.sol", "Token"))
+        self.log.append([{"contract": "Token", "record": "generation", "generation": 0},
+                         {"contract": "Token", "record": "summary", "source": "Token.sol"}])
+        self.assertTrue(self.log.analyzed("Token.sol", "Token"))
+        self.assertFalse(self.log.analyzed("Token.sol", "TokenSale"))
+        self.assertFalse(self.log.analyzed("Other.sol", "Token"))
+
+if __name__ == '__main__':
+    unittest.main()
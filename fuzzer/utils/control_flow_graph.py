@@ -2,9 +2,39 @@
 # -*- coding: utf-8 -*-
 
 import os
+import bisect
+import collections
 import subprocess
 
-from .utils import remove_swarm_hash, convert_stack_value_to_int
+from . import settings
+from .utils import disassemble, convert_stack_value_to_int
+
+# Opcodes that end the execution: STOP, RETURN, REVERT, INVALID, SELFDESTRUCT
+TERMINATING_OPCODES = {0, 243, 253, 254, 255}
+
+# Number of values popped and pushed by the opcodes other than PUSH, DUP and SWAP
+STACK_EFFECTS = {
+    0: (0, 0), 1: (2, 1), 2: (2, 1), 3: (2, 1), 4: (2, 1), 5: (2, 1), 6: (2, 1), 7: (2, 1), 8: (3, 1), 9: (3, 1), 10: (2, 1), 11: (2, 1),
+    16: (2, 1), 17: (2, 1), 18: (2, 1), 19: (2, 1), 20: (2, 1), 21: (1, 1), 22: (2, 1), 23: (2, 1), 24: (2, 1), 25: (1, 1), 26: (2, 1),
+    27: (2, 1), 28: (2, 1), 29: (2, 1),
+    32: (2, 1),
+    48: (0, 1), 49: (1, 1), 50: (0, 1), 51: (0, 1), 52: (0, 1), 53: (1, 1), 54: (0, 1), 55: (3, 0), 56: (0, 1), 57: (3, 0), 58: (0, 1),
+    59: (1, 1), 60: (4, 0), 61: (0, 1), 62: (3, 0), 63: (1, 1),
+    64: (1, 1), 65: (0, 1), 66: (0, 1), 67: (0, 1), 68: (0, 1), 69: (0, 1), 70: (0, 1), 71: (0, 1), 72: (0, 1),
+    80: (1, 0), 81: (1, 1), 82: (2, 0), 83: (2, 0), 84: (1, 1), 85: (2, 0), 86: (1, 0), 87: (2, 0), 88: (0, 1), 89: (0, 1), 90: (0, 1), 91: (0, 0),
+    160: (2, 0), 161: (3, 0), 162: (4, 0), 163: (5, 0), 164: (6, 0),
+    240: (3, 1), 241: (7, 1), 242: (7, 1), 243: (2, 0), 244: (6, 1), 245: (4, 1), 250: (6, 1), 253: (2, 0), 254: (0, 0), 255: (1, 0)
+}
+
+# Opcodes folded when their operands are known. Only operations with a bounded
+# result are folded, so that loop counters do not make the analysis diverge.
+CONSTANT_FOLDING = {
+    16: lambda a, b: int(a < b),        # LT
+    17: lambda a, b: int(a > b),        # GT
+    20: lambda a, b: int(a == b),       # EQ
+    21: lambda a: int(a == 0),          # ISZERO
+    22: lambda a, b: a & b              # AND
+}
 
 class BasicBlock:
     def __init__(self):
@@ -52,18 +82,25 @@ class ControlFlowGraph:
         self.visited_branches = {}
         self.error_pcs = set()
         self.can_send_ether = False
+        self.instructions = ()
+        # Results of the static analysis, see analyze()
+        self.block_successors = {}
+        self.block_predecessors = {}
+        self.block_starts = []
+        self.constant_branches = {}
+        self.complete = False
 
     def build(self, bytecode, evm_version):
-        bytecode = bytes.fromhex(remove_swarm_hash(bytecode).replace("0x", ""))
-        current_pc = 0
+        opcode_to_mnemonic = self.opcode_to_mnemonic[evm_version]
+        next_pc = 0
         previous_pc = 0
         basic_block = None
         previous_opcode = None
         previous_push_value = None
-        while current_pc < len(bytecode):
-            opcode = bytecode[current_pc]
+        for current_pc, opcode, push_data in disassemble(bytecode):
+            next_pc = current_pc + 1
 
-            if opcode in self.opcode_to_mnemonic[evm_version] and self.opcode_to_mnemonic[evm_version][opcode] in ["CREATE", "CALL", "DELEGATECALL", "SELFDESTRUCT", "SUICIDE"]:
+            if opcode_to_mnemonic.get(opcode) in ("CREATE", "CALL", "DELEGATECALL", "SELFDESTRUCT", "SUICIDE"):
                 self.can_send_ether = True
 
             if previous_opcode == 255: # SELFDESTRUCT
@@ -84,9 +121,9 @@ class ControlFlowGraph:
                 basic_block = BasicBlock()
                 basic_block.set_start_address(current_pc)
 
-            if opcode < 96 or opcode > 127: # PUSH??
-                if opcode in self.opcode_to_mnemonic[evm_version]:
-                    basic_block.add_instruction(current_pc, self.opcode_to_mnemonic[evm_version][opcode])
+            if push_data is None:
+                if opcode in opcode_to_mnemonic:
+                    basic_block.add_instruction(current_pc, opcode_to_mnemonic[opcode])
                 else:
                     basic_block.add_instruction(current_pc, "Missing opcode "+hex(opcode))
 
@@ -108,26 +145,169 @@ class ControlFlowGraph:
                         self.edges[current_pc].append(previous_push_value)
 
             previous_pc = current_pc
-            if opcode >= 96 and opcode <= 127: # PUSH??
-                size = opcode - 96 + 1
-                previous_push_value = ""
-                for i in range(size):
-                    try:
-                        previous_push_value += str(hex(bytecode[current_pc+i+1])).replace("0x", "").zfill(2)
-                    except Exception as e:
-                        pass
-                if previous_push_value:
-                    previous_push_value = "0x" + previous_push_value
-                    basic_block.add_instruction(current_pc, self.opcode_to_mnemonic[evm_version][opcode]+" "+previous_push_value)
-                    previous_push_value = int(previous_push_value, 16)
-                    current_pc += size
-
-            current_pc += 1
+            if push_data: # PUSH??
+                basic_block.add_instruction(current_pc, opcode_to_mnemonic[opcode]+" 0x"+push_data.hex())
+                previous_push_value = int.from_bytes(push_data, "big")
+                next_pc += opcode - 96 + 1
+
             previous_opcode = opcode
 
         if basic_block:
             basic_block.set_end_address(previous_pc)
-            self.vertices[current_pc] = basic_block
+            self.vertices[next_pc] = basic_block
+
+        self.instructions = disassemble(bytecode)
+        self.analyze(self.instructions)
+
+    def analyze(self, instructions):
+        '''
+        Resolves jump targets statically by propagating the constants pushed
+        on the stack through the basic blocks, one abstract stack per block
+        and calling context. Values that are not constant are None.
+        A JUMPI whose condition is constant in every context only has one
+        feasible side, which is recorded in constant_branches. If the
+        analysis had to stop early, complete is False and constant_branches
+        stays empty, since unexplored contexts could take the other side.
+        '''
+        # Basic blocks end at JUMP, JUMPI and terminating or unknown opcodes, and start at JUMPDEST
+        blocks = {}
+        block = None
+        for instruction in instructions:
+            pc, opcode, push_data = instruction
+            if block is None or opcode == 91:
+                block = blocks[pc] = []
+            block.append(instruction)
+            if opcode in (86, 87) or opcode in TERMINATING_OPCODES or (push_data is None and opcode not in STACK_EFFECTS and not 128 <= opcode <= 159):
+                block = None
+        self.block_starts = sorted(blocks)
+        jumpdests = [start for start in self.block_starts if blocks[start][0][1] == 91]
+        successors = {start: set() for start in blocks}
+        feasible_sides = {}
+
+        worklist = [(0, ())] if blocks else []
+        states = set()
+        unresolved = False
+        self.complete = True
+        while worklist:
+            state = worklist.pop()
+            if state in states:
+                continue
+            if len(states) >= settings.CFG_MAX_STATES:
+                self.complete = False
+                break
+            states.add(state)
+            start, stack = state
+            stack = list(stack)
+            for pc, opcode, push_data in blocks[start]:
+                if push_data is not None:
+                    stack.append(int.from_bytes(push_data.ljust(opcode - 95, b"\0"), "big"))
+                elif 128 <= opcode <= 143: # DUP
+                    n = opcode - 127
+                    stack.append(stack[-n] if len(stack) >= n else None)
+                elif 144 <= opcode <= 159: # SWAP
+                    n = opcode - 143
+                    if len(stack) <= n:
+                        stack[:0] = [None] * (n + 1 - len(stack))
+                    stack[-1], stack[-1 - n] = stack[-1 - n], stack[-1]
+                elif opcode == 88: # PC
+                    stack.append(pc)
+                else:
+                    pops, pushes = STACK_EFFECTS.get(opcode, (0, 0))
+                    arguments = [stack.pop() if stack else None for _ in range(pops)]
+                    if pushes:
+                        if opcode in CONSTANT_FOLDING and None not in arguments:
+                            stack.append(CONSTANT_FOLDING[opcode](*arguments))
+                        else:
+                            stack.append(None)
+            if len(stack) > 1024: # Stack overflow
+                continue
+
+            targets = set()
+            last_pc, opcode, push_data = blocks[start][-1]
+            if opcode in (86, 87):
+                destination = arguments[0]
+                sides = {True, False} if opcode == 86 or arguments[1] is None else {arguments[1] != 0}
+                if opcode == 87:
+                    feasible_sides.setdefault(last_pc, set()).update(sides)
+                    if False in sides:
+                        targets.add(last_pc + 1)
+                if True in sides:
+                    if destination is None:
+                        # Any JUMPDEST can be reached, with a stack that is unknown
+                        successors[start].update(jumpdests)
+                        if not unresolved:
+                            unresolved = True
+                            worklist.extend((jumpdest, ()) for jumpdest in jumpdests)
+                    elif destination in blocks and blocks[destination][0][1] == 91:
+                        targets.add(destination)
+                        if last_pc not in self.edges:
+                            self.edges[last_pc] = []
+                        if destination not in self.edges[last_pc]:
+                            self.edges[last_pc].append(destination)
+            elif opcode not in TERMINATING_OPCODES and (push_data is not None or opcode in STACK_EFFECTS or 128 <= opcode <= 159):
+                targets.add(last_pc + 1 + (len(push_data) if push_data else 0))
+            stack = tuple(stack)
+            for target in targets:
+                if target in blocks:
+                    successors[start].add(target)
+                    worklist.append((target, stack))
+
+        self.block_successors = successors
+        self.block_predecessors = {start: set() for start in blocks}
+        for start in successors:
+            for successor in successors[start]:
+                self.block_predecessors[successor].add(start)
+        self.constant_branches = {pc: sides.pop() for pc, sides in feasible_sides.items() if len(sides) == 1} if self.complete else {}
+
+    def compute_distances(self, pcs):
+        '''
+        Shortest number of edges from every basic block to a block containing
+        one of pcs. Blocks from which none of them can be reached are omitted.
+        '''
+        distances = {}
+        queue = collections.deque()
+        for pc in pcs:
+            block = self.get_block(pc)
+            if block is not None and block not in distances:
+                distances[block] = 0
+                queue.append(block)
+        while queue:
+            block = queue.popleft()
+            for predecessor in self.block_predecessors[block]:
+                if predecessor not in distances:
+                    distances[predecessor] = distances[block] + 1
+                    queue.append(predecessor)
+        return distances
+
+    def get_target_pcs(self, targets, evm_version, source_map=None):
+        '''
+        pcs of targets given as pcs (e.g. 0x1a2), mnemonics (e.g. SELFDESTRUCT)
+        or source lines (e.g. line:42). Raises ValueError for a target that
+        cannot be parsed.
+        '''
+        pcs = set()
+        opcode_to_mnemonic = self.opcode_to_mnemonic[evm_version]
+        for target in targets:
+            if target.lower().startswith("line:"):
+                if not source_map:
+                    raise ValueError("source lines require the source code: " + target)
+                line = int(target[5:]) - 1
+                for pc in source_map.instr_positions:
+                    location = source_map.get_location(pc)
+                    if location["begin"] and location["begin"]["line"] == line:
+                        pcs.add(pc)
+            elif target.upper() in opcode_to_mnemonic.values():
+                pcs.update(pc for pc, opcode, _ in self.instructions if opcode_to_mnemonic.get(opcode) == target.upper())
+            else:
+                pcs.add(int(target, 0))
+        return pcs
+
+    def get_block(self, pc):
+        '''
+        Start address of the basic block of the static analysis containing pc.
+        '''
+        index = bisect.bisect_right(self.block_starts, pc) - 1
+        return self.block_starts[index] if index >= 0 else None
 
     def execute(self, pc, stack, mnemonic, visited_branches, error_pcs):
         if mnemonic == "JUMP":
@@ -169,12 +349,12 @@ class ControlFlowGraph:
             if basic_block.get_end_address() in self.edges:
                 # JUMPI
                 if list(basic_block.get_instructions().values())[-1] == "JUMPI":
-                    if hex(basic_block.get_end_address()) in self.visited_branches and 0 in self.visited_branches[hex(basic_block.get_end_address())] and self.visited_branches[hex(basic_block.get_end_address())][0]["expression"]:
-                        f.write('"'+hex(basic_block.get_start_address())+'" -> "'+hex(self.edges[basic_block.get_end_address()][0])+'" [label=" '+str(self.visited_branches[hex(basic_block.get_end_address())][0]["expression"][-1])+'",color="red"];\n')
+                    if basic_block.get_end_address() in self.visited_branches and 0 in self.visited_branches[basic_block.get_end_address()] and self.visited_branches[basic_block.get_end_address()][0]["expression"]:
+                        f.write('"'+hex(basic_block.get_start_address())+'" -> "'+hex(self.edges[basic_block.get_end_address()][0])+'" [label=" '+str(self.visited_branches[basic_block.get_end_address()][0]["expression"][-1])+'",color="red"];\n')
                     else:
                         f.write('"'+hex(basic_block.get_start_address())+'" -> "'+hex(self.edges[basic_block.get_end_address()][0])+'" [label="",color="red"];\n')
-                    if hex(basic_block.get_end_address()) in self.visited_branches and 1 in self.visited_branches[hex(basic_block.get_end_address())] and self.visited_branches[hex(basic_block.get_end_address())][1]["expression"]:
-                        f.write('"'+hex(basic_block.get_start_address())+'" -> "'+hex(self.edges[basic_block.get_end_address()][1])+'" [label=" '+str(self.visited_branches[hex(basic_block.get_end_address())][1]["expression"][-1])+'",color="green"];\n')
+                    if basic_block.get_end_address() in self.visited_branches and 1 in self.visited_branches[basic_block.get_end_address()] and self.visited_branches[basic_block.get_end_address()][1]["expression"]:
+                        f.write('"'+hex(basic_block.get_start_address())+'" -> "'+hex(self.edges[basic_block.get_end_address()][1])+'" [label=" '+str(self.visited_branches[basic_block.get_end_address()][1]["expression"][-1])+'",color="green"];\n')
                     else:
                         f.write('"'+hex(basic_block.get_start_address())+'" -> "'+hex(self.edges[basic_block.get_end_address()][1])+'" [label="",color="green"];\n')
                 # Other instructions
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Append-only results file in the JSON lines format, which any number of fuzzer
+processes can share. Every line is one record of a contract:
+
+    {"contract": ..., "record": "generation", ...}      statistics of a generation
+    {"contract": ..., "record": "error", "pc": ..., ...} a detected error
+    {"contract": ..., "record": "minimized", "pc": ..., "type": ..., "individual": [...]}
+    {"contract": ..., "record": "summary", "source": ..., ...} the remaining results, once the run is over
+
+Compaction into the JSON shape written with a .json results file:
+    python3 -m utils.results results.jsonl results.json
+'''
+
+import os
+import sys
+import json
+import fcntl
+
+class ResultsLog:
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, records):
+        '''
+        Append records under an exclusive lock, so that the lines of
+        concurrent writers never interleave.
+        '''
+        if not records:
+            return
+        data = "".join(json.dumps(record) + "\n" for record in records)
+        with open(self.path, "a") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.write(data)
+                file.flush()
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def records(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as file:
+            fcntl.flock(file, fcntl.LOCK_SH)
+            try:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # Line of a writer that was killed mid-write
+                        continue
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def analyzed(self, source, contract):
+        '''
+        Whether a summary of the contract of the source file was written, the
+        other contracts of the same file are analyzed separately.
+        '''
+        return any(record["record"] == "summary" and record.get("source") == source and record["contract"] == contract for record in self.records())
+
+    def compact(self):
+        '''
+        Results of all contracts in the shape of a .json results file.
+        '''
+        results = dict()
+        for record in self.records():
+            record = dict(record)
+            contract = results.setdefault(record.pop("contract"), {"errors": {}, "generations": []})
+            kind = record.pop("record")
+            # A resumed run reports the generation of its checkpoint and the errors found before again
+            if kind == "generation":
+                if contract["generations"] and contract["generations"][-1]["generation"] == record["generation"]:
+                    contract["generations"].pop()
+                contract["generations"].append(record)
+            elif kind == "error":
+                errors = contract["errors"].setdefault(str(record.pop("pc")), [])
+                if not any(error["type"] == record["type"] for error in errors):
+                    errors.append(record)
+            elif kind == "minimized":
+                for error in contract["errors"].get(str(record["pc"]), []):
+                    if error["type"] == record["type"]:
+                        error["minimized_individual"] = record["individual"]
+            elif kind == "summary":
+                record.pop("source", None)
+                contract.update(record)
+        return results
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python3 -m utils.results <results.jsonl> <results.json>")
+        sys.exit(-1)
+    results = ResultsLog(sys.argv[1]).compact()
+    with open(sys.argv[2] + ".tmp", "w") as file:
+        json.dump(results, file)
+    os.replace(sys.argv[2] + ".tmp", sys.argv[2])
+
+if __name__ == '__main__':
+    main()
@@ -29,6 +29,8 @@ GAS_PRICE = 10
 ACCOUNT_BALANCE = 100000000*(10**18)
 # Maximum length of individuals
 MAX_INDIVIDUAL_LENGTH = 5
+# Maximum number of values kept per generator pool
+MAX_RING_BUFFER_LENGTH = 10
 # Logging level
 LOGGING_LEVEL = logging.INFO
 # Block height
@@ -41,3 +43,21 @@ RPC_PORT = 8545
 REMOTE_FUZZING = False
 # True = Environmental instrumentation enabled, False = Environmental instrumentation disabled
 ENVIRONMENTAL_INSTRUMENTATION = True
+# True = Minimize the transaction sequences of reported errors, False = Report them as found
+EXPLOIT_MINIMIZATION = False
+# Maximum number of seconds to wait for pending minimizations before writing the results (bounded by the global timeout)
+MINIMIZATION_TIMEOUT = 60
+# Maximum number of errors waiting for minimization, further errors are reported as found
+MINIMIZATION_QUEUE_SIZE = 10
+# Maximum number of execution results reused across generations (0 = re-execute every generation)
+EXECUTION_CACHE_SIZE = 10000
+# Maximum number of coverage-increasing individuals kept in the corpus (0 = no corpus)
+CORPUS_SIZE = 1000
+# Minimum number of seconds between two checkpoints of the fuzzing session
+CHECKPOINT_INTERVAL = 60
+# Number of seconds between two rows of the coverage and findings timeline
+TIMELINE_INTERVAL = 10
+# Maximum number of (basic block, abstract stack) states explored to resolve jump targets statically
+CFG_MAX_STATES = 100000
+# Fitness of an individual that reaches a target in directed fuzzing, divided by 1 + its distance to the targets otherwise
+DISTANCE_FITNESS_WEIGHT = 100
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from utils.utils import get_pcs_and_jumpis
+from utils.utils import disassemble
 
 class Source:
     def __init__(self, filename):
@@ -91,7 +91,7 @@ class SourceMap:
         try:
             filename, contract_name = self.cname.split(":")
             bytecode = self.compiler_output['contracts'][filename][contract_name]["evm"]["deployedBytecode"]["object"]
-            pcs = get_pcs_and_jumpis(bytecode)[0]
+            pcs = [pc for pc, _, _ in disassemble(bytecode)]
             for i in range(len(self.positions)):
                 if self.positions[i] and self.positions[i]['name'] != 'tag':
                     instr_positions[pcs[j]] = self.positions[i]
@@ -8,6 +8,7 @@ import shlex
 import solcx
 import logging
 import eth_utils
+import functools
 import subprocess
 
 from web3 import Web3
@@ -155,20 +156,37 @@ def remove_swarm_hash(bytecode):
             bytecode = re.sub(r"5056fe.*?0033$", "5056", bytecode)
     return bytecode
 
-def get_pcs_and_jumpis(bytecode):
-    bytecode = bytes.fromhex(remove_swarm_hash(bytecode).replace("0x", ""))
+def disassemble(bytecode):
+    '''
+    Instructions of bytecode as a tuple of (pc, opcode, push data), where the
+    push data is None for instructions other than PUSH and may be truncated
+    at the end of the code. The table is shared by the control-flow graph,
+    the coverage totals and the source map, and is disassembled once per code.
+    '''
+    return _disassemble(remove_swarm_hash(bytecode).replace("0x", "").lower())
+
+@functools.lru_cache(maxsize=64)
+def _disassemble(code):
+    code = bytes.fromhex(code)
+    instructions = []
+    append = instructions.append
     i = 0
-    pcs = []
-    jumpis = []
-    while i < len(bytecode):
-        opcode = bytecode[i]
-        pcs.append(i)
-        if opcode == 87: # JUMPI
-            jumpis.append(hex(i))
-        if opcode >= 96 and opcode <= 127: # PUSH
-            size = opcode - 96 + 1
-            i += size
-        i += 1
+    length = len(code)
+    while i < length:
+        opcode = code[i]
+        if 96 <= opcode <= 127: # PUSH
+            end = i + opcode - 94
+            append((i, opcode, code[i + 1:end]))
+            i = end
+        else:
+            append((i, opcode, None))
+            i += 1
+    return tuple(instructions)
+
+def get_pcs_and_jumpis(bytecode):
+    instructions = disassemble(bytecode)
+    pcs = [pc for pc, _, _ in instructions]
+    jumpis = [pc for pc, opcode, _ in instructions if opcode == 87] # JUMPI
     if len(pcs) == 0:
         pcs = [0]
     return (pcs, jumpis)
@@ -196,13 +214,12 @@ def split_len(seq, length):
     return [seq[i:i + length] for i in range(0, len(seq), length)]
 
 def print_individual_solution_as_transaction(logger, individual_solution, color="", function_signature_mapping={}, transaction_index=None):
-    for index, input in enumerate(individual_solution):
-        transaction = input["transaction"]
-        if not transaction["to"] == None:
-            if transaction["data"].startswith("0x"):
-                hash = transaction["data"][0:10]
+    for index, transaction in enumerate(individual_solution):
+        if not transaction.to == None:
+            if transaction.data.startswith("0x"):
+                hash = transaction.data[0:10]
             else:
-                hash = transaction["data"][0:8]
+                hash = transaction.data[0:8]
             if len(individual_solution) == 1 or (transaction_index != None and transaction_index == 0):
                 if hash in function_signature_mapping:
                     logger.title(color+"Transaction - " + function_signature_mapping[hash] + ":")
@@ -214,12 +231,12 @@ def print_individual_solution_as_transaction(logger, individual_solution, color=
                 else:
                     logger.title(color+"Transaction " + str(index + 1) + ":")
             logger.title(color+"-----------------------------------------------------")
-            logger.title(color+"From:      " + transaction["from"])
-            logger.title(color+"To:        " + str(transaction["to"]))
-            logger.title(color+"Value:     " + str(transaction["value"]) + " Wei")
-            logger.title(color+"Gas Limit: " + str(transaction["gaslimit"]))
+            logger.title(color+"From:      " + transaction.sender)
+            logger.title(color+"To:        " + str(transaction.to))
+            logger.title(color+"Value:     " + str(transaction.value) + " Wei")
+            logger.title(color+"Gas Limit: " + str(transaction.gaslimit))
             i = 0
-            for data in split_len("0x" + transaction["data"].replace("0x", ""), 42):
+            for data in split_len("0x" + transaction.data.replace("0x", ""), 42):
                 if i == 0:
                     logger.title(color+"Input:     " + str(data))
                 else: